@@ -0,0 +1,20 @@
+"""Gunicorn settings for the web process: ``gunicorn ngo_tracker.wsgi:application -c gunicorn.conf.py``.
+
+Job progress streams (SSE and long-poll) hold a request thread for up to
+``JOB_EVENTS_MAX_SECONDS``, so workers are threaded; with gunicorn's default
+single sync worker one open stream would block every other request.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+worker_class = 'gthread'
+# WEB_CONCURRENCY is also what Render and Heroku-style hosts set for the worker count
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+# Concurrent requests (open progress streams included) per worker. Each
+# thread can keep a database connection open for DB_CONN_MAX_AGE, so keep
+# workers * threads within the database's connection limit (or use PgBouncer)
+threads = int(os.getenv('GUNICORN_THREADS', '20'))
+
+# Outlast the longest progress stream, so a worker is never killed mid-stream
+timeout = int(os.getenv('GUNICORN_TIMEOUT', str(int(os.getenv('JOB_EVENTS_MAX_SECONDS', '300')) + 30)))
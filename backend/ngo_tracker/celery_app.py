@@ -10,6 +10,11 @@ app = Celery('ngo_tracker')
 # the configuration object to child processes.
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
+# Database connections follow the Django settings: Celery's Django fixup closes
+# connections inherited from the parent when a worker process starts, and after
+# every task closes those past CONN_MAX_AGE or failing CONN_HEALTH_CHECKS, so
+# the workers reuse connections the same way the web processes do.
+
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
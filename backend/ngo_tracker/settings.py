@@ -44,7 +44,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files
+    'ngo_tracker.middleware.StaticFilesMiddleware',  # WhiteNoise, for static files (WSGI and ASGI)
+    'reports.metrics.MetricsMiddleware',  # Latency, query and response size metrics
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,6 +74,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'ngo_tracker.wsgi.application'
+ASGI_APPLICATION = 'ngo_tracker.asgi.application'
 
 
 # Database
@@ -89,6 +91,16 @@ if USE_SQLITE:
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
+    # SQLite builds the covering report index without its INCLUDE columns
+    SILENCED_SYSTEM_CHECKS = ['models.W040']
+    # A second SQLite file standing in for a read replica, to try replica
+    # routing locally (fill it with `migrate --database replica` or a copy)
+    if os.getenv('SQLITE_REPLICA_NAME'):
+        DATABASES['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_REPLICA_NAME'),
+            'TEST': {'MIRROR': 'default'},
+        }
 else:
     # PostgreSQL configuration for production
     # Render provides DATABASE_URL, or use individual variables
@@ -113,6 +125,33 @@ else:
             }
         }
 
+    # Keep connections open for reuse by later requests (and Celery tasks) for
+    # DB_CONN_MAX_AGE seconds instead of reconnecting every time (0 closes them
+    # after each one). With health checks on, a reused connection that the
+    # server has dropped is replaced before the request uses it.
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+    # Required behind a transaction-pooling PgBouncer (exports then buffer each chunk client-side)
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', 'False') == 'True'
+
+    # Optional read replica (e.g. a streaming standby of the primary), with
+    # the same connection settings
+    replica_url = os.getenv('REPLICA_DATABASE_URL')
+    if replica_url:
+        DATABASES['replica'] = dj_database_url.parse(replica_url)
+        for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'DISABLE_SERVER_SIDE_CURSORS'):
+            if key in DATABASES['default']:
+                DATABASES['replica'][key] = DATABASES['default'][key]
+        DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# With a 'replica' database, dashboard, listing, export and job status reads
+# go to it (see reports.routers); writes and everything else use 'default'
+if 'replica' in DATABASES:
+    DATABASE_ROUTERS = ['reports.routers.ReplicaRouter']
+# Seconds after a write during which the months and jobs it touched are still
+# read from the primary, covering replication lag (0 disables the guard)
+REPLICA_LAG_SECONDS = int(os.getenv('REPLICA_LAG_SECONDS', '5'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -159,6 +198,45 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache
+# Local memory by default. Set CACHE_URL (e.g. redis://localhost:6379/1) to share
+# the cache, and its invalidations, between web processes and Celery workers.
+CACHE_URL = os.getenv('CACHE_URL')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Cache dashboard and job-status payloads. Writes invalidate them through the
+# cache, so a process-local cache would go on serving payloads that another
+# process (a second web worker, or a Celery worker) has just changed. On by
+# default only with CACHE_URL; with the local cache, enable it only when one
+# process both serves requests and runs the imports.
+CACHE_RESPONSES = os.getenv('CACHE_RESPONSES', str(bool(CACHE_URL))) == 'True'
+# Seconds cached dashboard and job-status payloads may live; writes invalidate them earlier
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '300'))
+JOB_STATUS_CACHE_TIMEOUT = int(os.getenv('JOB_STATUS_CACHE_TIMEOUT', '30'))
+
+# Job progress streams (job-status/<id>/events and /wait). Notifications are
+# relayed between processes over Redis pub-sub when PROGRESS_PUBSUB_URL is set
+# (defaults to CACHE_URL); without it only the current process is notified
+# and waiters fall back to re-checking every JOB_EVENTS_POLL_INTERVAL seconds.
+PROGRESS_PUBSUB_URL = os.getenv('PROGRESS_PUBSUB_URL', CACHE_URL or '')
+JOB_EVENTS_POLL_INTERVAL = float(os.getenv('JOB_EVENTS_POLL_INTERVAL', '5'))
+# Seconds an SSE stream stays open before the client reconnects, and the
+# longest (and default) timeout of a long-poll request
+JOB_EVENTS_MAX_SECONDS = int(os.getenv('JOB_EVENTS_MAX_SECONDS', '300'))
+JOB_STATUS_LONG_POLL_TIMEOUT = int(os.getenv('JOB_STATUS_LONG_POLL_TIMEOUT', '25'))
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -193,4 +271,98 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# Run tasks in-process instead of sending them to the broker (no Redis needed)
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_TASK_EAGER_PROPAGATES = True
+# Fail fast when publishing to an unreachable broker so uploads can fall back
+# to in-process processing instead of hanging the request
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'max_retries': int(os.getenv('CELERY_BROKER_PUBLISH_MAX_RETRIES', '0')),
+}
+# Periodic tasks, run by `celery beat` (or a worker started with --beat)
+CELERY_BEAT_SCHEDULE = {
+    'requeue-stalled-uploads': {
+        'task': 'reports.tasks.requeue_stalled_uploads',
+        'schedule': float(os.getenv('BULK_UPLOAD_WATCHDOG_INTERVAL', '60')),
+    },
+    'discard-failed-uploads': {
+        'task': 'reports.tasks.discard_failed_uploads',
+        'schedule': 3600.0,
+    },
+}
+
 
+# Bulk CSV upload settings
+# Number of CSV rows validated and written per multi-row upsert
+BULK_UPLOAD_BATCH_SIZE = int(os.getenv('BULK_UPLOAD_BATCH_SIZE', '1000'))
+
+# Job progress counters are flushed at most every N rows or T milliseconds
+BULK_UPLOAD_PROGRESS_EVERY_ROWS = int(os.getenv('BULK_UPLOAD_PROGRESS_EVERY_ROWS', '5000'))
+BULK_UPLOAD_PROGRESS_INTERVAL_MS = int(os.getenv('BULK_UPLOAD_PROGRESS_INTERVAL_MS', '1000'))
+
+# Rejected rows are buffered and written to BulkUploadRowError at most N at a time
+BULK_UPLOAD_ERROR_BUFFER_SIZE = int(os.getenv('BULK_UPLOAD_ERROR_BUFFER_SIZE', '1000'))
+
+# Process uploads on Celery workers instead of inside the request. Uploads are
+# spooled to BULK_UPLOAD_SPOOL_DIR, which must be shared with the workers.
+BULK_UPLOAD_ASYNC = os.getenv('BULK_UPLOAD_ASYNC', 'False') == 'True'
+BULK_UPLOAD_SPOOL_DIR = os.getenv('BULK_UPLOAD_SPOOL_DIR', os.path.join(BASE_DIR, 'spool'))
+
+# Uploads with at least BULK_UPLOAD_SHARD_MIN_ROWS rows are split into this many
+# shards and imported in parallel by Celery workers (1 disables sharding)
+BULK_UPLOAD_SHARDS = int(os.getenv('BULK_UPLOAD_SHARDS', '1'))
+BULK_UPLOAD_SHARD_MIN_ROWS = int(os.getenv('BULK_UPLOAD_SHARD_MIN_ROWS', '100000'))
+
+# Skip re-importing repeated uploads: chunks an earlier upload applied are not
+# written again while the stored reports still match
+BULK_UPLOAD_DEDUP = os.getenv('BULK_UPLOAD_DEDUP', 'True') == 'True'
+
+# Spooled jobs whose progress has not moved for BULK_UPLOAD_STALL_SECONDS are
+# resumed from their checkpoint by the requeue_stalled_uploads watchdog, at
+# most BULK_UPLOAD_MAX_RESUMES times, then marked failed
+BULK_UPLOAD_STALL_SECONDS = int(os.getenv('BULK_UPLOAD_STALL_SECONDS', '600'))
+BULK_UPLOAD_MAX_RESUMES = int(os.getenv('BULK_UPLOAD_MAX_RESUMES', '3'))
+# Seconds a failed job keeps its spooled file for a manual resume before the
+# hourly discard_failed_uploads sweep removes it
+BULK_UPLOAD_FAILED_RETENTION_SECONDS = int(os.getenv('BULK_UPLOAD_FAILED_RETENTION_SECONDS', str(7 * 24 * 3600)))
+
+# Maximum number of reports accepted by POST /api/reports/batch
+REPORT_BATCH_MAX_SIZE = int(os.getenv('REPORT_BATCH_MAX_SIZE', '1000'))
+
+# Reports fetched per server-side cursor round trip (and encoded per chunk) by GET /api/reports/export
+REPORT_EXPORT_CHUNK_SIZE = int(os.getenv('REPORT_EXPORT_CHUNK_SIZE', '2000'))
+
+# Also match reports by their month string while Report.period may be unset
+# (rows written by processes that predate the column). Turn off once
+# `manage.py backfill_report_periods` reports nothing left to update.
+REPORT_PERIOD_FALLBACK = os.getenv('REPORT_PERIOD_FALLBACK', 'True') == 'True'
+
+# Request and import metrics, served in the Prometheus text format at /metrics
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+# Requests slower than this are logged as warnings by reports.metrics
+METRICS_SLOW_REQUEST_MS = int(os.getenv('METRICS_SLOW_REQUEST_MS', '1000'))
+
+# Logging: key=value lines on the console. LOG_LEVEL=DEBUG also logs every
+# request and synchronous upload; the default INFO keeps those calls free.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {
+            'format': 'ts=%(asctime)s level=%(levelname)s logger=%(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'plain',
+        },
+    },
+    'loggers': {
+        'reports': {
+            'handlers': ['console'],
+            'level': os.getenv('LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
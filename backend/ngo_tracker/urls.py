@@ -4,8 +4,11 @@ URL configuration for ngo_tracker project.
 from django.contrib import admin
 from django.urls import path, include
 
+from reports.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('reports.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
 
@@ -1,15 +1,40 @@
 from django.contrib import admin
-from .models import Report, BulkUploadJob
+from .models import Report, BulkUploadJob, BulkUploadRowError, MonthlySummary
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """View-only admin for tables that must only change through the API.
+
+    Report writes go through the upserts in ``reports.ingest``, which keep
+    the ``MonthlySummary`` rollup and the dashboard cache in step; saving or
+    deleting rows here would bypass both.
+    """
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Report)
-class ReportAdmin(admin.ModelAdmin):
+class ReportAdmin(ReadOnlyAdmin):
     list_display = ['ngo_id', 'month', 'people_helped', 'events_conducted', 'funds_utilized', 'created_at']
     list_filter = ['month', 'created_at']
     search_fields = ['ngo_id']
     readonly_fields = ['created_at', 'updated_at']
 
 
+@admin.register(MonthlySummary)
+class MonthlySummaryAdmin(ReadOnlyAdmin):
+    list_display = ['month', 'total_ngos_reporting', 'total_people_helped', 'total_events_conducted', 'total_funds_utilized', 'updated_at']
+    search_fields = ['month']
+    readonly_fields = ['updated_at']
+
+
 @admin.register(BulkUploadJob)
 class BulkUploadJobAdmin(admin.ModelAdmin):
     list_display = ['job_id', 'status', 'total_rows', 'processed_rows', 'successful_rows', 'failed_rows', 'created_at']
@@ -17,3 +42,11 @@ class BulkUploadJobAdmin(admin.ModelAdmin):
     search_fields = ['job_id']
     readonly_fields = ['job_id', 'created_at', 'updated_at']
 
+
+
+@admin.register(BulkUploadRowError)
+class BulkUploadRowErrorAdmin(admin.ModelAdmin):
+    list_display = ['job', 'row_number', 'code', 'field', 'raw_value']
+    list_filter = ['code']
+    search_fields = ['job__job_id']
+    raw_id_fields = ['job']
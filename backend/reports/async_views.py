@@ -0,0 +1,65 @@
+"""Async variants of the most polled read endpoints, for ASGI deployments.
+
+Served under ``/api/async/`` with the same payloads, caching and ETags as
+the views they mirror. Django 4.2 runs async ORM calls on a thread, so a
+request still holds one while it queries the database; what it no longer
+holds a thread for is everything else, such as cache lookups and ETag hits.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotAllowed
+
+from .cache import acached_response, adashboard_cache_key, ajob_status_cache_key
+from .models import BulkUploadJob, MonthlySummary
+from .pagination import apaginate_reports
+from .periods import amonth_filter
+from .routers import areplica_reads, job_key, month_key
+from .serializers import BulkUploadJobSerializer
+from .views import _dashboard_response, _month_param, _month_reports, _page_options
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def _error(data, status):
+    """A JSON error rendered like DRF's (there is no DRF view here to render a ``Response``)."""
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+async def dashboard(request):
+    """Async ``views.dashboard``."""
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+    month, error_response = _month_param(request)
+    if error_response:
+        return _error(error_response.data, error_response.status_code)
+    
+    async def build():
+        async with areplica_reads([month_key(month)]):
+            summary = await MonthlySummary.objects.filter(month=month).afirst() or MonthlySummary(month=month)
+            try:
+                reports = _month_reports(request, await amonth_filter(month))
+                individual_reports, next_cursor = await apaginate_reports(reports, **_page_options(request))
+            except ValueError as e:
+                return _error({'error': str(e)}, 400)
+        
+        return _dashboard_response(month, summary, individual_reports, next_cursor)
+    
+    return await acached_response(request, await adashboard_cache_key(month, request), build,
+                                  settings.DASHBOARD_CACHE_TIMEOUT)
+
+
+async def job_status(request, job_id):
+    """Async ``views.job_status``."""
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+    
+    async def build():
+        async with areplica_reads([job_key(job_id)]):
+            try:
+                job = await BulkUploadJob.objects.aget(job_id=job_id)
+            except BulkUploadJob.DoesNotExist:
+                return _error({'error': 'Job not found'}, 404)
+        return Response(BulkUploadJobSerializer(job).data)  # Rendered like the sync view's for a shared ETag
+    
+    return await acached_response(request, await ajob_status_cache_key(job_id), build, settings.JOB_STATUS_CACHE_TIMEOUT)
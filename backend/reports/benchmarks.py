@@ -0,0 +1,525 @@
+"""Benchmarks for the reports hot paths, run via ``manage.py benchmark``.
+
+Each scenario takes a row count and returns a dict of measurements;
+``run_scenario`` adds the process's peak RSS. Data is written inside
+a transaction that is rolled back afterwards, so running a benchmark never
+leaves rows behind. The load comparison serves requests from other threads,
+which cannot see uncommitted rows, so it commits its rows and deletes them
+when it is done.
+"""
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.files import File
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from itertools import islice
+from operator import itemgetter
+from wsgiref.util import setup_testing_defaults
+import asyncio
+import django
+import math
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+from . import ingest
+from .models import BulkUploadJob, MonthlySummary, Report
+from .pagination import MAX_PAGE_SIZE, paginate_reports
+from .periods import month_filter, parse_month
+from .summaries import ngo_rankings
+from .serializers import REPORT_FIELDS, ReportSerializer, iter_reports_json, report_rows
+
+
+BENCHMARK_MONTH = '1900-01'
+
+# Requests timed by the latency scenarios (after one warm-up request)
+LATENCY_REQUESTS = 200
+# Requests and concurrent clients of the WSGI/ASGI load comparison
+LOAD_REQUESTS = 1000
+LOAD_CONCURRENCY = 50
+_report_ngo_id = itemgetter(REPORT_FIELDS.index('ngo_id'))
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _QueryCounter:
+    """``connection.execute_wrapper`` hook counting the statements executed."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _counting_queries(fn):
+    """Run ``fn()`` and return its result with the number of statements it executed."""
+    counter = _QueryCounter()
+    with connection.execute_wrapper(counter):
+        result = fn()
+    return result, counter.count
+
+
+def _peak_rss_mb():
+    """High-water mark of this process's resident set size, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)  # Bytes on macOS, KiB elsewhere
+
+
+def _percentile(samples, percent):
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def _latency(samples):
+    return {
+        'p50_ms': round(_percentile(samples, 50) * 1000, 2),
+        'p99_ms': round(_percentile(samples, 99) * 1000, 2),
+    }
+
+
+def _timed(fn, repeat=3):
+    """Best wall-clock time of ``repeat`` runs, plus the last result."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _rolled_back(fn):
+    """Run ``fn()`` in a transaction that is rolled back, returning its result."""
+    outcome = {}
+    try:
+        with transaction.atomic():
+            outcome.update(fn())
+            raise _Rollback
+    except _Rollback:
+        pass
+    return outcome
+
+
+def _insert_reports(rows):
+    """Insert ``rows`` synthetic reports for ``BENCHMARK_MONTH``, in batches."""
+    reports = (
+        Report(
+            ngo_id=f'BENCH{i:07d}',
+            month=BENCHMARK_MONTH,
+            period=parse_month(BENCHMARK_MONTH),
+            people_helped=i % 1000,
+            events_conducted=i % 50,
+            funds_utilized=Decimal(i % 100000) / 100,
+        )
+        for i in range(rows)
+    )
+    while batch := list(islice(reports, 5000)):
+        Report.objects.bulk_create(batch)
+
+
+def _with_reports(rows, fn):
+    """Run ``fn()`` against ``rows`` synthetic reports in a rolled-back transaction."""
+    def run():
+        _insert_reports(rows)
+        return fn()
+
+    return _rolled_back(run)
+
+
+def _with_committed_reports(rows, fn):
+    """Run ``fn()`` against ``rows`` committed synthetic reports, deleting them (and their rollup) afterwards."""
+    if Report.objects.filter(month=BENCHMARK_MONTH).exists():
+        raise RuntimeError(f'Reports for {BENCHMARK_MONTH} already exist; not overwriting them')
+    try:
+        with transaction.atomic():
+            _insert_reports(rows)
+            MonthlySummary.objects.create(month=BENCHMARK_MONTH, total_ngos_reporting=rows)
+        return fn()
+    finally:
+        Report.objects.filter(month=BENCHMARK_MONTH).delete()
+        MonthlySummary.objects.filter(month=BENCHMARK_MONTH).delete()
+
+
+def bench_serialization(rows):
+    """ReportSerializer + JSONRenderer versus the values_list fast path."""
+    def run():
+        queryset = Report.objects.filter(month_filter(BENCHMARK_MONTH)).order_by('ngo_id')
+        drf_time, drf_bytes = _timed(lambda: JSONRenderer().render(ReportSerializer(queryset, many=True).data))
+        fast_time, fast_bytes = _timed(lambda: b''.join(iter_reports_json(report_rows(queryset))))
+        return {
+            'drf_seconds': round(drf_time, 4),
+            'fast_seconds': round(fast_time, 4),
+            'speedup': round(drf_time / fast_time, 2) if fast_time else None,
+            'identical_output': drf_bytes == fast_bytes,
+        }
+
+    return _with_reports(rows, run)
+
+
+def bench_validation(rows, chunk_size=1000):
+    """Per-row ``validate_row`` loop versus the columnar ``validate_rows`` stage.
+
+    Uses in-memory CSV rows (about 5% of them invalid), so no database
+    access is involved. Each chunk's results are dropped before the next
+    one is validated, as ``ingest_rows`` does.
+    """
+    data = [
+        (i, {
+            'ngo_id': f'BENCH{i:07d}',
+            'month': f'2024-{i % 12 + 1:02d}' if i % 40 else '2024-13',
+            'people_helped': str(i % 1000) if i % 50 else 'n/a',
+            'events_conducted': str(i % 50),
+            'funds_utilized': f'{i % 100000 / 100:.2f}' if i % 60 else '-1.00',
+        })
+        for i in range(1, rows + 1)
+    ]
+
+    chunks = [data[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+
+    def in_chunks(validate):
+        def run():
+            for chunk in chunks:
+                validate(chunk)
+        return run
+
+    per_row_time, _ = _timed(in_chunks(ingest._validate_each))
+    columnar_time, _ = _timed(in_chunks(ingest.validate_rows))
+    return {
+        'per_row_seconds': round(per_row_time, 4),
+        'columnar_seconds': round(columnar_time, 4),
+        'speedup': round(per_row_time / columnar_time, 2) if columnar_time else None,
+        'identical_output': all(ingest._validate_each(chunk) == ingest.validate_rows(chunk) for chunk in chunks),
+    }
+
+
+def bench_import(rows):
+    """``ingest_rows`` over ``rows`` CSV rows: first as inserts, then as updates.
+
+    Index maintenance dominates both passes, which makes this the scenario
+    to compare ``Report`` index layouts with.
+    """
+    data = [
+        (i, {
+            'ngo_id': f'BENCH{i:07d}',
+            'month': BENCHMARK_MONTH,
+            'people_helped': str(i % 1000),
+            'events_conducted': str(i % 50),
+            'funds_utilized': f'{i % 100000 / 100:.2f}',
+        })
+        for i in range(1, rows + 1)
+    ]
+
+    def run():
+        (insert_time, inserted), insert_queries = _counting_queries(
+            lambda: _timed(lambda: ingest.ingest_rows(data, settings.BULK_UPLOAD_BATCH_SIZE), repeat=1))
+        update_time, updated = _timed(lambda: ingest.ingest_rows(data, settings.BULK_UPLOAD_BATCH_SIZE), repeat=1)
+        return {
+            'insert_seconds': round(insert_time, 4),
+            'update_seconds': round(update_time, 4),
+            'rows_per_second': round(rows / insert_time) if insert_time else None,
+            'insert_queries': insert_queries,
+            'all_written': inserted.successful_rows == updated.successful_rows == rows,
+        }
+
+    return _rolled_back(run)
+
+
+def bench_dashboard(rows):
+    """The month queries behind the dashboard: first report page, full walk and rankings."""
+    def walk():
+        pages, cursor = 0, None
+        while True:
+            page, cursor = paginate_reports(report_rows(Report.objects.filter(month_filter(BENCHMARK_MONTH))),
+                                            cursor=cursor, page_size=MAX_PAGE_SIZE, key=_report_ngo_id)
+            pages += 1
+            if cursor is None:
+                return pages
+
+    def run():
+        first_page_time, _ = _timed(lambda: paginate_reports(
+            report_rows(Report.objects.filter(month_filter(BENCHMARK_MONTH))), key=_report_ngo_id))
+        walk_time, pages = _timed(walk)
+        rankings_time, _ = _timed(lambda: ngo_rankings(BENCHMARK_MONTH, BENCHMARK_MONTH))
+        return {
+            'first_page_seconds': round(first_page_time, 4),
+            'walk_seconds': round(walk_time, 4),
+            'pages': pages,
+            'rankings_seconds': round(rankings_time, 4),
+        }
+
+    return _with_reports(rows, run)
+
+
+def write_sample_csv(file, rows, invalid_every=50):
+    """Write ``rows`` synthetic reports in the upload format to a text ``file``.
+
+    Like ``sample_data.csv``, but at any size: 1,000 NGOs reporting over the
+    twelve months of 1900 (well away from real data), with every
+    ``invalid_every``-th row rejected by validation.
+    """
+    file.write(','.join(ingest.REQUIRED_FIELDS) + '\n')
+    for i in range(1, rows + 1):
+        people_helped = 'n/a' if invalid_every and i % invalid_every == 0 else i % 1000
+        file.write(f'BENCH{i:07d},1900-{i % 12 + 1:02d},{people_helped},{i % 50},{i % 100000 / 100:.2f}\n')
+
+
+def bench_csv_import(rows):
+    """End-to-end ``_process_csv_upload_internal`` run over a synthetic CSV file."""
+    from .tasks import _process_csv_upload_internal
+
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', delete=False) as csv_file:
+        write_sample_csv(csv_file, rows)
+
+    def run():
+        job = BulkUploadJob.objects.create(job_id=f'bench-{uuid.uuid4()}', total_rows=rows)
+        start = time.perf_counter()
+        with open(csv_file.name, 'rb') as upload:
+            _, queries = _counting_queries(lambda: _process_csv_upload_internal(job.job_id, file=File(upload)))
+        elapsed = time.perf_counter() - start
+        job.refresh_from_db()
+        return {
+            'seconds': round(elapsed, 4),
+            'rows_per_second': round(rows / elapsed) if elapsed else None,
+            'queries': queries,
+            'status': job.status,
+            'successful_rows': job.successful_rows,
+            'failed_rows': job.failed_rows,
+        }
+
+    try:
+        return _rolled_back(run)
+    finally:
+        os.remove(csv_file.name)
+
+
+def bench_submit_report(rows):
+    """``POST /api/report`` latency against a table of ``rows`` reports (half creates, half updates)."""
+    client = Client()
+
+    def submit(i):
+        start = time.perf_counter()
+        response = client.post('/api/report', {
+            'ngo_id': f'BENCH{i:07d}',
+            'month': BENCHMARK_MONTH,
+            'people_helped': i % 1000 + 1,
+            'events_conducted': 1,
+            'funds_utilized': '1.00',
+        }, content_type='application/json')
+        if response.status_code not in (200, 201):
+            raise RuntimeError(f'Submitting a report failed: {response.content!r}')
+        return time.perf_counter() - start
+
+    def run():
+        submit(0)
+        # Even requests update existing reports, odd ones create new keys past the table
+        samples, queries = _counting_queries(
+            lambda: [submit(i // 2 if i % 2 == 0 else rows + i) for i in range(LATENCY_REQUESTS)])
+        return {'requests': len(samples), **_latency(samples), 'queries_per_request': queries / len(samples)}
+
+    return _with_reports(rows, run)
+
+
+def bench_dashboard_latency(rows):
+    """``GET /api/dashboard`` latency for a month of ``rows`` reports, with and without the cache."""
+    client = Client()
+    run_id = uuid.uuid4().hex  # Keeps cache entries from earlier runs out of the way
+
+    def fetch(query):
+        start = time.perf_counter()
+        response = client.get(f'/api/dashboard?month={BENCHMARK_MONTH}&run={run_id}{query}')
+        if response.status_code != 200:
+            raise RuntimeError(f'Fetching the dashboard failed: {response.content!r}')
+        return time.perf_counter() - start
+
+    def run():
+        with override_settings(DASHBOARD_CACHE_TIMEOUT=0):
+            uncached, uncached_queries = _counting_queries(
+                lambda: [fetch(f'&request={i}') for i in range(LATENCY_REQUESTS)])
+        # Measured with the cache on even where CACHE_RESPONSES is off (no shared cache)
+        with override_settings(CACHE_RESPONSES=True):
+            fetch('')
+            cached, cached_queries = _counting_queries(lambda: [fetch('') for _ in range(LATENCY_REQUESTS)])
+        return {
+            'requests': LATENCY_REQUESTS,
+            **{f'uncached_{key}': value for key, value in _latency(uncached).items()},
+            'uncached_queries_per_request': uncached_queries / LATENCY_REQUESTS,
+            **{f'cached_{key}': value for key, value in _latency(cached).items()},
+            'cached_queries_per_request': cached_queries / LATENCY_REQUESTS,
+        }
+
+    return _with_reports(rows, run)
+
+
+class _ThreadPeak:
+    """Highest number of live threads seen by ``sample()``."""
+
+    def __init__(self):
+        self.peak = 0
+
+    def sample(self):
+        self.peak = max(self.peak, threading.active_count())
+
+
+def _load_result(samples, elapsed, threads):
+    return {
+        'requests_per_second': round(len(samples) / elapsed),
+        **_latency(samples),
+        'peak_threads': threads.peak,
+    }
+
+
+def _wsgi_load(application, path, query, requests, concurrency):
+    """Serve ``requests`` GETs through a WSGI ``application`` from ``concurrency`` threads."""
+    threads = _ThreadPeak()
+
+    def call(i):
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': f'{query}&request={i}'}
+        setup_testing_defaults(environ)
+        statuses = []
+        start = time.perf_counter()
+        response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        try:
+            b''.join(response)
+        finally:
+            response.close()
+        threads.sample()
+        if not statuses[0].startswith('200'):
+            raise RuntimeError(f'GET {path} failed: {statuses[0]}')
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(call, range(requests)))
+    return _load_result(samples, time.perf_counter() - start, threads)
+
+
+async def _asgi_load(application, path, query, requests, concurrency):
+    """Serve ``requests`` GETs through an ASGI ``application``, ``concurrency`` at a time on one event loop."""
+    threads = _ThreadPeak()
+    slots = asyncio.Semaphore(concurrency)
+    disconnected = asyncio.Event()  # Never set: clients stay connected
+
+    async def call(i):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode('ascii'), 'root_path': '',
+            'query_string': f'{query}&request={i}'.encode('ascii'), 'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+        }
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await disconnected.wait()
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async with slots:
+            start = time.perf_counter()
+            await application(scope, receive, send)
+            threads.sample()
+        if messages[0]['status'] != 200:
+            raise RuntimeError(f'GET {path} failed: {messages[0]["status"]}')
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(call(i) for i in range(requests)))
+    return _load_result(samples, time.perf_counter() - start, threads)
+
+
+def bench_dashboard_concurrency(rows):
+    """WSGI versus ASGI: ``LOAD_CONCURRENCY`` clients fetching an uncached dashboard page.
+
+    Compares the sync view under WSGI (a thread per client, as with a
+    threaded WSGI worker), the same view under ASGI, and the async view
+    under ASGI. The applications are driven in-process, so this measures
+    Django's request handling, not an HTTP server.
+    """
+    query = f'month={BENCHMARK_MONTH}&run={uuid.uuid4().hex}'
+
+    def run():
+        wsgi, asgi = get_wsgi_application(), get_asgi_application()
+        with override_settings(DASHBOARD_CACHE_TIMEOUT=0):
+            results = {
+                'wsgi': _wsgi_load(wsgi, '/api/dashboard', query, LOAD_REQUESTS, LOAD_CONCURRENCY),
+                'asgi_sync_view': asyncio.run(
+                    _asgi_load(asgi, '/api/dashboard', query, LOAD_REQUESTS, LOAD_CONCURRENCY)),
+                'asgi_async_view': asyncio.run(
+                    _asgi_load(asgi, '/api/async/dashboard', query, LOAD_REQUESTS, LOAD_CONCURRENCY)),
+            }
+        return {
+            'requests': LOAD_REQUESTS,
+            'concurrency': LOAD_CONCURRENCY,
+            **{f'{mode}_{key}': value for mode, result in results.items() for key, value in result.items()},
+        }
+
+    return _with_committed_reports(rows, run)
+
+
+SCENARIOS = {
+    'csv_import': bench_csv_import,
+    'dashboard': bench_dashboard,
+    'dashboard_concurrency': bench_dashboard_concurrency,
+    'dashboard_latency': bench_dashboard_latency,
+    'import': bench_import,
+    'serialization': bench_serialization,
+    'submit_report': bench_submit_report,
+    'validation': bench_validation,
+}
+
+
+def run_scenario(name, rows):
+    """Run one scenario, adding the process's peak RSS afterwards.
+
+    Peak RSS is a high-water mark for the whole process, so compare it
+    between runs that execute the same scenarios in the same order.
+    """
+    return {**SCENARIOS[name](rows), 'peak_rss_mb': _peak_rss_mb()}
+
+
+def environment():
+    """Describe where a benchmark run happened, for comparing saved results."""
+    if connection.vendor == 'postgresql':
+        version = connection.pg_version
+    elif connection.vendor == 'sqlite':
+        import sqlite3
+        version = sqlite3.sqlite_version
+    else:
+        version = None
+    return {
+        'started_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'database': {'vendor': connection.vendor, 'version': version},
+        'batch_size': settings.BULK_UPLOAD_BATCH_SIZE,
+    }
@@ -0,0 +1,179 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+import hashlib
+import time
+
+from .events import publish_job_progress
+from .routers import job_key, mark_written, month_key
+
+
+# Cached entries are keyed on a generation counter that invalidation bumps,
+# rather than deleted: a reader that loaded its data before a write commits
+# computed its key under the old generation, so what it caches afterwards is
+# never served. Keys must be computed before the data is read.
+
+def _month_version_key(month):
+    return f'dashboard:version:{month}'
+
+
+def _job_version_key(job_id):
+    return f'job-status:version:{job_id}'
+
+
+def _version(key):
+    """Current cache generation stored under ``key``."""
+    version = cache.get(key)
+    if version is None:
+        # Start from a fresh value so entries cached under an evicted counter are never reused
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def _aversion(key):
+    """Async ``_version``."""
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass  # Nothing cached under it yet
+
+
+def _dashboard_variant(request):
+    return hashlib.md5(request.get_full_path().encode('utf-8'), usedforsecurity=False).hexdigest()
+
+
+def dashboard_cache_key(month, request):
+    """Cache key for a dashboard payload, varying on the request's query string."""
+    return f'dashboard:{month}:{_version(_month_version_key(month))}:{_dashboard_variant(request)}'
+
+
+async def adashboard_cache_key(month, request):
+    """Async ``dashboard_cache_key``."""
+    return f'dashboard:{month}:{await _aversion(_month_version_key(month))}:{_dashboard_variant(request)}'
+
+
+def job_status_cache_key(job_id):
+    """Cache key for a job's status payload."""
+    return f'job-status:{job_id}:{_version(_job_version_key(job_id))}'
+
+
+async def ajob_status_cache_key(job_id):
+    """Async ``job_status_cache_key``."""
+    return f'job-status:{job_id}:{await _aversion(_job_version_key(job_id))}'
+
+
+def invalidate_months(months):
+    """Drop every cached dashboard payload for ``months`` once the current transaction commits.
+
+    The months are also marked as written, so replica reads fall back to the
+    primary for them while the replica may lag (see ``routers``).
+    """
+    months = set(months)
+
+    def bump():
+        mark_written(month_key(month) for month in months)
+        for month in months:
+            _bump_version(_month_version_key(month))
+
+    transaction.on_commit(bump)
+
+
+def invalidate_job_status(job_id):
+    """Drop the cached status payload for a bulk upload job once the current transaction commits.
+
+    Its progress subscribers are woken up then too.
+
+    The job is marked as written for replica reads too, as in ``invalidate_months``.
+    """
+    def drop():
+        mark_written([job_key(job_id)])
+        _bump_version(_job_version_key(job_id))
+        publish_job_progress(job_id)
+
+    transaction.on_commit(drop)
+
+
+def _cache_entry(response):
+    """The ``(etag, content)`` cache entry for a 200 response, else ``None``."""
+    if response.status_code != status.HTTP_200_OK:
+        return None
+    if isinstance(response, Response):
+        content = JSONRenderer().render(response.data)
+    else:
+        content = response.content
+    return quote_etag(hashlib.md5(content, usedforsecurity=False).hexdigest()), content
+
+
+def cached_content(key, build, timeout):
+    """Return the cached ``(etag, content)`` entry for ``key``, building it on a miss.
+
+    ``build()`` returns the response to use on a cache miss, either a DRF
+    ``Response`` or an ``HttpResponse`` with a JSON body. Only 200 responses
+    are cached, as rendered JSON bytes; any other response is returned as
+    ``(None, response)``. With ``CACHE_RESPONSES`` off the entry is built
+    every time.
+    """
+    if not settings.CACHE_RESPONSES:
+        response = build()
+        return _cache_entry(response) or (None, response)
+    entry = cache.get(key)
+    if entry is None:
+        response = build()
+        entry = _cache_entry(response)
+        if entry is None:
+            return None, response
+        cache.set(key, entry, timeout)
+    return entry
+
+
+def _conditional_response(request, etag, content):
+    client_etags = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in client_etags or '*' in client_etags:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    return response
+
+
+def cached_response(request, key, build, timeout):
+    """Serve a read endpoint from the cache with ``ETag``/``If-None-Match`` support.
+
+    See ``cached_content`` for how entries are built. A request whose
+    ``If-None-Match`` matches the cached payload gets an empty 304.
+    """
+    etag, content = cached_content(key, build, timeout)
+    if etag is None:
+        return content
+    return _conditional_response(request, etag, content)
+
+
+async def acached_response(request, key, build, timeout):
+    """Async ``cached_response`` for async views; ``build`` is a coroutine function.
+
+    Non-200 responses from ``build()`` must be plain ``HttpResponse`` objects,
+    since there is no DRF view to render them.
+    """
+    entry = await cache.aget(key) if settings.CACHE_RESPONSES else None
+    if entry is None:
+        response = await build()
+        entry = _cache_entry(response)
+        if entry is None:
+            return response
+        if settings.CACHE_RESPONSES:
+            await cache.aset(key, entry, timeout)
+    return _conditional_response(request, *entry)
@@ -0,0 +1,31 @@
+from .models import BulkUploadChunk
+
+
+class ChunkLedger:
+    """Records the content-hashed chunks of an upload and recognises ones seen before.
+
+    ``is_known()`` tells whether an earlier completed job applied a chunk
+    with the same digest without errors. That only says the chunk is worth
+    checking: ``ingest_rows`` then compares its rows with what is stored and
+    skips the write if they already match. ``record()`` buffers this job's
+    chunks (with the months their valid rows were written to); they are
+    written with ``flush()``.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self._pending = []
+
+    def is_known(self, digest):
+        return BulkUploadChunk.objects.filter(digest=digest, failed_rows=0, job__status='completed').exists()
+
+    def record(self, digest, months, row_count, failed_rows):
+        self._pending.append(BulkUploadChunk(
+            job=self.job, digest=digest, months=months, row_count=row_count, failed_rows=failed_rows,
+        ))
+
+    def flush(self):
+        """Write the recorded chunks to the database."""
+        if self._pending:
+            BulkUploadChunk.objects.bulk_create(self._pending)
+            self._pending = []
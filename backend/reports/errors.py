@@ -0,0 +1,68 @@
+from django.conf import settings
+import csv
+import io
+
+from .models import BulkUploadRowError
+from .ingest import REQUIRED_FIELDS
+
+
+class RowErrorLog:
+    """Buffers rejected rows of a ``BulkUploadJob`` and writes them in batches.
+
+    At most ``buffer_size`` errors are held in memory; reaching the limit
+    writes them with one ``bulk_create``. ``ingest_rows`` also flushes after
+    every batch of reports, so the error table fills in as the import runs.
+    """
+
+    def __init__(self, job, buffer_size=None):
+        self.job = job
+        self.buffer_size = buffer_size or settings.BULK_UPLOAD_ERROR_BUFFER_SIZE
+        self._pending = []
+
+    def add(self, error, row=None):
+        """Buffer a ``RowError`` together with the CSV ``row`` dict it came from."""
+        raw_row = {key: value for key, value in (row or {}).items() if key is not None}
+        self._pending.append(BulkUploadRowError(
+            job=self.job,
+            row_number=error.row_number,
+            code=error.code,
+            field=error.field,
+            raw_value=error.raw_value or '',
+            message=error.message,
+            raw_row=raw_row,
+        ))
+        if len(self._pending) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered errors to the database."""
+        if self._pending:
+            BulkUploadRowError.objects.bulk_create(self._pending)
+            self._pending = []
+
+
+def iter_rejected_rows_csv(job, chunk_rows=1000):
+    """Yield a job's rejected rows as CSV text, ready to be fixed and re-uploaded.
+
+    The columns are the upload format (``REQUIRED_FIELDS``) followed by
+    ``row_number`` and ``error`` for reference; the importer ignores the
+    extra columns on re-upload. Rows are read from the database ``job`` was
+    loaded from.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(REQUIRED_FIELDS + ['row_number', 'error'])
+
+    rows = (
+        job.row_errors
+        .order_by('row_number', 'id')
+        .values_list('raw_row', 'row_number', 'message')
+    )
+    for count, (raw_row, row_number, message) in enumerate(rows.iterator(chunk_size=chunk_rows), start=1):
+        writer.writerow([raw_row.get(field) or '' for field in REQUIRED_FIELDS] + [row_number, message])
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
@@ -0,0 +1,145 @@
+"""Progress notifications for bulk upload jobs.
+
+Whenever a job's status changes, ``publish_job_progress(job_id)`` wakes every
+request waiting on that job in this process. When ``PROGRESS_PUBSUB_URL``
+points at Redis, the notification is also published on the
+``job-progress:<job_id>`` channel, and each web process runs one listener
+thread that relays those messages into its local waiters. Celery workers
+can therefore wake the streams served by any web process while each
+process holds a single Redis subscription.
+
+Notifications carry no payload: subscribers re-read the (cached) job status.
+"""
+from django.conf import settings
+import threading
+import time
+
+CHANNEL_PREFIX = 'job-progress:'
+
+
+class _JobWaiters:
+    """Notification counter and condition for the threads waiting on one job."""
+
+    def __init__(self, lock):
+        self.version = 0
+        self.count = 0
+        self.condition = threading.Condition(lock)
+
+
+class LocalChannel:
+    """In-process fan-out of job notifications to waiting threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}  # job_id -> _JobWaiters, only while someone waits
+
+    def publish(self, job_id):
+        with self._lock:
+            waiters = self._jobs.get(job_id)
+            if waiters is not None:
+                waiters.version += 1
+                waiters.condition.notify_all()
+
+    def subscribe(self, job_id):
+        """Register interest in ``job_id`` and return its current version."""
+        with self._lock:
+            waiters = self._jobs.get(job_id)
+            if waiters is None:
+                waiters = self._jobs[job_id] = _JobWaiters(self._lock)
+            waiters.count += 1
+            return waiters.version
+
+    def unsubscribe(self, job_id):
+        with self._lock:
+            waiters = self._jobs.get(job_id)
+            if waiters is not None:
+                waiters.count -= 1
+                if waiters.count <= 0:
+                    del self._jobs[job_id]
+
+    def wait(self, job_id, version, timeout):
+        """Block until ``job_id`` moves past ``version`` or ``timeout`` seconds pass.
+
+        Returns the version seen on wake-up. The caller must be subscribed.
+        """
+        with self._lock:
+            waiters = self._jobs[job_id]
+            waiters.condition.wait_for(lambda: waiters.version != version, timeout)
+            return waiters.version
+
+
+local_channel = LocalChannel()
+
+_redis = None
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _redis_client():
+    global _redis
+    if _redis is None:
+        import redis
+        # Short timeouts: publishing happens on the import path and must not stall it
+        _redis = redis.Redis.from_url(settings.PROGRESS_PUBSUB_URL, socket_connect_timeout=1, socket_timeout=1)
+    return _redis
+
+
+def _listen():
+    """Relay Redis notifications into ``local_channel``, reconnecting on errors."""
+    import redis
+    client = redis.Redis.from_url(settings.PROGRESS_PUBSUB_URL, socket_connect_timeout=5, health_check_interval=30)
+    while True:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(f'{CHANNEL_PREFIX}*')
+            for message in pubsub.listen():
+                if message['type'] == 'pmessage':
+                    local_channel.publish(message['channel'].decode('utf-8')[len(CHANNEL_PREFIX):])
+        except Exception:
+            time.sleep(1)
+
+
+def _ensure_listener():
+    global _listener
+    if not settings.PROGRESS_PUBSUB_URL or _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen, name='job-progress-listener', daemon=True)
+            _listener.start()
+
+
+def publish_job_progress(job_id):
+    """Notify subscribers that ``job_id`` changed. Never raises."""
+    local_channel.publish(job_id)
+    if settings.PROGRESS_PUBSUB_URL:
+        try:
+            _redis_client().publish(f'{CHANNEL_PREFIX}{job_id}', b'1')
+        except Exception:
+            pass  # Subscribers still re-check on their poll interval
+
+
+class JobSubscription:
+    """Context manager for waiting on one job's notifications.
+
+    Notifications that arrive between ``wait()`` calls are not lost; the
+    next ``wait()`` returns immediately.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    def __enter__(self):
+        _ensure_listener()
+        self.version = local_channel.subscribe(self.job_id)
+        return self
+
+    def __exit__(self, *exc_info):
+        local_channel.unsubscribe(self.job_id)
+
+    def wait(self, timeout):
+        """Wait up to ``timeout`` seconds; return ``True`` if a notification arrived."""
+        version = local_channel.wait(self.job_id, self.version, timeout)
+        changed = version != self.version
+        self.version = version
+        return changed
@@ -0,0 +1,153 @@
+"""Streaming exports of reports as CSV, JSON Lines or Parquet.
+
+Rows are read with a server-side cursor (``QuerySet.iterator``) and encoded
+``chunk_rows`` at a time, so memory use does not grow with the size of the
+export. Each ``iter_*`` function yields ``bytes`` chunks for a
+``StreamingHttpResponse``.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from decimal import Decimal
+from itertools import islice
+import csv
+import io
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: only needed for format=parquet
+    pa = pq = None
+
+from .models import Report
+from .periods import month_range_filter
+from .summaries import CENTS
+from .serializers import REPORT_FIELDS, fast_report_dicts, iter_reports_jsonl, report_rows
+
+
+def export_rows(start, end, chunk_rows, using=None):
+    """``report_rows()`` tuples for ``start``..``end`` (``YYYY-MM``), streamed from the ``using`` database."""
+    queryset = Report.objects.using(using).filter(month_range_filter(start, end)).order_by('period', 'ngo_id')
+    return report_rows(queryset).iterator(chunk_size=chunk_rows)
+
+
+def iter_csv(rows, chunk_rows):
+    """CSV with a ``REPORT_FIELDS`` header, formatted as in the JSON API (and re-uploadable)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(REPORT_FIELDS)
+    for count, report in enumerate(fast_report_dicts(rows), start=1):
+        writer.writerow(report.values())
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def iter_jsonl(rows, chunk_rows):
+    """One JSON object per line, identical to the reports in the JSON API."""
+    lines = iter_reports_jsonl(rows)
+    while True:
+        chunk = b''.join(islice(lines, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _ParquetSink(io.RawIOBase):
+    """Write-only file that hands out what has been written so far.
+
+    ``tell()`` keeps counting across ``take()`` calls, since the Parquet
+    footer records absolute column chunk offsets.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet_schema():
+    return pa.schema([
+        ('id', pa.int64()),
+        ('ngo_id', pa.string()),
+        ('month', pa.string()),
+        ('people_helped', pa.int64()),
+        ('events_conducted', pa.int64()),
+        ('funds_utilized', pa.decimal128(15, 2)),
+        ('created_at', pa.timestamp('us', tz='UTC')),
+    ])
+
+
+def iter_parquet(rows, chunk_rows):
+    """A Parquet file with one row group per ``chunk_rows`` reports. Requires ``pyarrow``."""
+    schema = _parquet_schema()
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                break
+            columns = list(zip(*chunk))
+            funds = REPORT_FIELDS.index('funds_utilized')
+            columns[funds] = [  # SQLite returns floats
+                value if isinstance(value, Decimal) else Decimal(value).quantize(CENTS)
+                for value in columns[funds]
+            ]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+class _ExportRenderer(BaseRenderer):
+    """Selects an export format through content negotiation (``?format=`` or ``Accept``).
+
+    The export view streams its own content; only error payloads are rendered, as JSON.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer().render(data)
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class JSONLinesRenderer(_ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
+
+
+class ParquetRenderer(_ExportRenderer):
+    media_type = 'application/vnd.apache.parquet'
+    format = 'parquet'
+
+
+# format -> (iterator, content type, compress with gzip if the client accepts it)
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv; charset=utf-8', True),
+    'jsonl': (iter_jsonl, 'application/x-ndjson', True),
+    'parquet': (iter_parquet, 'application/vnd.apache.parquet', False),  # Already compressed
+}
@@ -0,0 +1,663 @@
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from collections import namedtuple
+from operator import itemgetter
+import codecs
+import csv
+import hashlib
+import os
+import time
+import zlib
+
+from .metrics import IMPORT_ROWS, observe_stage, stage_timer
+from .models import Report
+from .periods import normalize_month, parse_month
+from .summaries import apply_report_changes, report_totals
+
+
+REQUIRED_FIELDS = ['ngo_id', 'month', 'people_helped', 'events_conducted', 'funds_utilized']
+
+# Extra column carrying the original row number in shard files
+SHARD_ROW_FIELD = '_row'
+
+# Columns overwritten when a row for an existing (ngo_id, month) is re-submitted
+# (period too, to fill it in on rows written before it existed)
+UPSERT_UPDATE_FIELDS = ['period', 'people_helped', 'events_conducted', 'funds_utilized', 'updated_at']
+
+
+def iter_decoded_lines(chunks, encoding='utf-8'):
+    """Incrementally decode byte chunks and yield text lines.
+
+    Lines keep their ``\\n`` terminator so the result can be fed straight to
+    ``csv.reader``/``csv.DictReader`` (quoted fields spanning lines included).
+    Raises ``UnicodeDecodeError`` if the input is not valid ``encoding``.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    for chunk in chunks:
+        text = pending + decoder.decode(chunk)
+        lines = text.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def spool_upload(file, name):
+    """Copy an uploaded file to ``BULK_UPLOAD_SPOOL_DIR`` and return its path.
+
+    Workers receive this path instead of the file contents, so the spool
+    directory must be shared between the web and worker processes.
+    """
+    os.makedirs(settings.BULK_UPLOAD_SPOOL_DIR, exist_ok=True)
+    path = os.path.join(settings.BULK_UPLOAD_SPOOL_DIR, f'{name}.csv')
+    with open(path, 'wb') as destination:
+        for chunk in file.chunks():
+            destination.write(chunk)
+    return path
+
+
+def iter_hashed(chunks, digest):
+    """Pass byte chunks through unchanged while feeding them to the hashlib object ``digest``."""
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+def count_csv_rows(chunks, encoding='utf-8'):
+    """Estimate the number of data rows from a newline count over byte chunks.
+
+    The input is decoded along the way so invalid encodings are rejected
+    before any processing starts. Quoted fields containing newlines make this
+    an over-estimate; the importer corrects ``total_rows`` once it finishes.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    newlines = 0
+    last_byte = b'\n'
+    for chunk in chunks:
+        if not chunk:
+            continue
+        decoder.decode(chunk)
+        newlines += chunk.count(b'\n')
+        last_byte = chunk[-1:]
+    decoder.decode(b'', final=True)
+
+    lines = newlines + (0 if last_byte == b'\n' else 1)
+    return max(lines - 1, 0)  # Exclude header row
+
+
+class RowError(namedtuple('RowError', ['row_number', 'code', 'message', 'field', 'raw_value'])):
+    """Why a CSV row was rejected.
+
+    ``code`` is a stable identifier (one of the ``ERROR_*`` constants);
+    ``field``/``raw_value`` name the offending column and its value when a
+    single column is to blame.
+    """
+
+    def __new__(cls, row_number, code, message, field='', raw_value=''):
+        return super().__new__(cls, row_number, code, message, field, raw_value)
+
+
+ERROR_MISSING_FIELDS = 'missing_fields'
+ERROR_INVALID_MONTH = 'invalid_month'
+ERROR_INVALID_NUMBER = 'invalid_number'
+ERROR_NEGATIVE_VALUE = 'negative_value'
+ERROR_INVALID_ROW = 'invalid_row'
+ERROR_WRITE_FAILED = 'write_failed'
+
+NUMERIC_FIELDS = [('people_helped', int), ('events_conducted', int), ('funds_utilized', float)]
+
+_required_cells = itemgetter(*REQUIRED_FIELDS)
+
+
+def validate_row(row, row_number):
+    """Validate a single CSV row.
+
+    Returns a ``(values, error)`` pair where exactly one of them is set;
+    ``error`` is a ``RowError``.
+    """
+    missing_fields = [field for field in REQUIRED_FIELDS if not row.get(field)]
+    if missing_fields:
+        return None, RowError(row_number, ERROR_MISSING_FIELDS,
+                              f"Row {row_number}: Missing fields: {', '.join(missing_fields)}",
+                              field=','.join(missing_fields))
+
+    try:
+        month = normalize_month(row['month'])
+    except ValueError:
+        return None, RowError(row_number, ERROR_INVALID_MONTH,
+                              f"Row {row_number}: Invalid month format '{row['month']}'. Use YYYY-MM",
+                              field='month', raw_value=row['month'])
+
+    numbers = {}
+    for field, parse in NUMERIC_FIELDS:
+        try:
+            numbers[field] = parse(row[field])
+        except ValueError as e:
+            return None, RowError(row_number, ERROR_INVALID_NUMBER,
+                                  f"Row {row_number}: Invalid numeric values - {str(e)}",
+                                  field=field, raw_value=row[field])
+
+    for field, _ in NUMERIC_FIELDS:
+        if numbers[field] < 0:
+            return None, RowError(row_number, ERROR_NEGATIVE_VALUE,
+                                  f"Row {row_number}: Negative values not allowed",
+                                  field=field, raw_value=row[field])
+
+    return {
+        'ngo_id': row['ngo_id'],
+        'month': month,
+        **numbers,
+    }, None
+
+
+def _validate_each(rows):
+    """Validate ``(row_number, row)`` pairs one at a time with ``validate_row``.
+
+    Returns ``(row_number, row, values, error)`` tuples in input order. A
+    row that ``validate_row`` cannot handle (e.g. non-string cells) is
+    rejected with ``ERROR_INVALID_ROW``.
+    """
+    results = []
+    for row_number, row in rows:
+        try:
+            values, error = validate_row(row, row_number)
+        except Exception as e:
+            values, error = None, RowError(row_number, ERROR_INVALID_ROW, f"Row {row_number}: {str(e)}")
+        results.append((row_number, row, values, error))
+    return results
+
+
+def _parse_column(parse, column):
+    """Apply ``parse`` to every value of ``column``.
+
+    Returns the parsed values, with ``None`` where ``parse`` raised, and the
+    indexes of those values. Runs of valid values are parsed by one ``map``
+    each rather than a call per value from Python.
+    """
+    values = []
+    failed = []
+    remaining = iter(column)
+    while True:
+        try:
+            # On an exception, the values parsed so far have been appended
+            # and the failing one consumed from ``remaining``
+            values.extend(map(parse, remaining))
+            return values, failed
+        except Exception:
+            failed.append(len(values))
+            values.append(None)
+
+
+def validate_rows(rows):
+    """Validate a chunk of ``(row_number, row)`` pairs, as ``validate_row`` would one at a time.
+
+    Returns ``(row_number, row, values, error)`` tuples in input order. The
+    chunk is checked a column at a time: each column is parsed with one
+    ``map`` (months through the cached ``normalize_month``) and scanned for
+    empty or negative values in C, which is faster than a Python call per
+    row. Rows any of those checks reject are then validated again by
+    ``validate_row``, so their error messages and codes are unchanged; a
+    row it cannot handle (e.g. non-string cells) is rejected with
+    ``ERROR_INVALID_ROW``.
+    """
+    try:
+        columns = list(zip(*map(_required_cells, map(itemgetter(1), rows))))
+    except Exception:
+        return _validate_each(rows)  # Rows without the required keys
+    if not columns:
+        return []
+
+    rejected = set()
+    for column in columns:
+        if not all(column):
+            rejected.update(index for index, value in enumerate(column) if not value)
+
+    ngo_ids, months = columns[0], columns[1]
+    months, failed = _parse_column(normalize_month, months)
+    rejected.update(failed)
+    numbers = []
+    for (_, parse), column in zip(NUMERIC_FIELDS, columns[2:]):
+        values, failed = _parse_column(parse, column)
+        rejected.update(failed)
+        for index in failed:
+            values[index] = parse(0)
+        is_negative = parse(0).__gt__  # (0).__gt__ or (0.0).__gt__, same type as the values
+        if any(map(is_negative, values)):
+            rejected.update(index for index, value in enumerate(values) if is_negative(value))
+        numbers.append(values)
+
+    results = [
+        (row_number, row, {
+            'ngo_id': ngo_id,
+            'month': month,
+            'people_helped': people_helped,
+            'events_conducted': events_conducted,
+            'funds_utilized': funds_utilized,
+        }, None)
+        for (row_number, row), ngo_id, month, people_helped, events_conducted, funds_utilized
+        in zip(rows, ngo_ids, months, *numbers)
+    ]
+    for index in rejected:
+        results[index] = _validate_each([rows[index]])[0]
+    return results
+
+
+def _latest_by_key(values_list):
+    latest = {}
+    for values in values_list:
+        latest[(values['ngo_id'], values['month'])] = values
+    return latest
+
+
+def stored_reports_match(values_list):
+    """Whether upserting ``values_list`` would leave every report as it is already stored.
+
+    Reads the affected reports in one query; later entries for the same key
+    win, as in ``upsert_reports``.
+    """
+    latest = _latest_by_key(values_list)
+    stored = Report.objects.filter(
+        ngo_id__in={ngo_id for ngo_id, _ in latest},
+        month__in={month for _, month in latest},
+    ).values_list('ngo_id', 'month', 'people_helped', 'events_conducted', 'funds_utilized')
+
+    matched = 0
+    for ngo_id, month, *totals in stored:
+        values = latest.get((ngo_id, month))
+        if values is None:
+            continue
+        new = (values['people_helped'], values['events_conducted'], values['funds_utilized'])
+        try:
+            if report_totals(*totals) != report_totals(*new):
+                return False
+        except Exception:
+            return False  # Not storable as is (e.g. too many digits); let the write report it
+        matched += 1
+    return matched == len(latest)
+
+
+# Set-based upsert for PostgreSQL. ``old`` reads (and locks) the rows being
+# replaced within the statement, so the rollup gets exact deltas. If another
+# transaction inserts a key after the statement's snapshot, ``old`` lacks it
+# and the ``DO UPDATE ... WHERE`` leaves the row alone, so it does not come
+# back; those keys are retried in a new statement, which sees the row. Rows
+# are locked and written in key order so concurrent batches cannot deadlock.
+UPSERT_REPORTS_SQL = """
+WITH new (ngo_id, month, period, people_helped, events_conducted, funds_utilized) AS (
+    VALUES {values}
+), old AS (
+    SELECT report.ngo_id, report.month, report.people_helped, report.events_conducted, report.funds_utilized
+    FROM {table} AS report JOIN new ON report.ngo_id = new.ngo_id AND report.month = new.month
+    ORDER BY report.ngo_id, report.month
+    FOR UPDATE OF report
+), upserted AS (
+    INSERT INTO {table} AS report (ngo_id, month, period, people_helped, events_conducted, funds_utilized, created_at, updated_at)
+    SELECT ngo_id, month, period, people_helped, events_conducted, funds_utilized, %s, %s
+    FROM new ORDER BY ngo_id, month
+    ON CONFLICT (ngo_id, month) DO UPDATE SET
+        period = EXCLUDED.period,
+        people_helped = EXCLUDED.people_helped,
+        events_conducted = EXCLUDED.events_conducted,
+        funds_utilized = EXCLUDED.funds_utilized,
+        updated_at = EXCLUDED.updated_at
+    WHERE EXISTS (SELECT 1 FROM old WHERE old.ngo_id = report.ngo_id AND old.month = report.month)
+    RETURNING report.id, report.ngo_id, report.month, report.created_at, report.updated_at
+)
+SELECT upserted.id, upserted.ngo_id, upserted.month, upserted.created_at, upserted.updated_at,
+       old.people_helped, old.events_conducted, old.funds_utilized
+FROM upserted LEFT JOIN old ON old.ngo_id = upserted.ngo_id AND old.month = upserted.month
+"""
+UPSERT_REPORTS_ROW = '(%s, %s, %s::date, %s::integer, %s::integer, %s::numeric)'
+
+# Statements tried before giving up on keys that other transactions keep inserting first
+UPSERT_MAX_ATTEMPTS = 3
+
+
+def _upsert_reports_postgresql(latest):
+    """Write ``latest`` (``(ngo_id, month)`` -> values) with ``UPSERT_REPORTS_SQL``.
+
+    Returns ``(ngo_id, month)`` -> ``(id, created_at, updated_at, old)``,
+    where ``old`` holds the replaced report's totals, or ``None`` if it was
+    created. Raises ``DatabaseError`` if keys still conflict after
+    ``UPSERT_MAX_ATTEMPTS`` statements.
+    """
+    table = connection.ops.quote_name(Report._meta.db_table)
+    now = timezone.now()
+    written = {}
+    pending = list(latest.items())
+    with connection.cursor() as cursor:
+        for _ in range(UPSERT_MAX_ATTEMPTS):
+            params = []
+            for (ngo_id, month), values in pending:
+                params += [ngo_id, month, parse_month(month), values['people_helped'],
+                           values['events_conducted'], values['funds_utilized']]
+            cursor.execute(
+                UPSERT_REPORTS_SQL.format(table=table, values=', '.join([UPSERT_REPORTS_ROW] * len(pending))),
+                params + [now, now],
+            )
+            for report_id, ngo_id, month, created_at, updated_at, *old in cursor.fetchall():
+                written[(ngo_id, month)] = (report_id, created_at, updated_at, None if old[0] is None else old)
+            pending = [(key, values) for key, values in pending if key not in written]
+            if not pending:
+                return written
+    raise DatabaseError(
+        f'Could not upsert {len(pending)} report(s) in {UPSERT_MAX_ATTEMPTS} attempts; '
+        'concurrent writers kept inserting them first'
+    )
+
+
+def upsert_reports(values_list):
+    """Insert or update reports keyed on ``(ngo_id, month)`` in one statement.
+
+    Uses ``INSERT ... ON CONFLICT (ngo_id, month) DO UPDATE`` on both
+    PostgreSQL and SQLite. Later entries for the same key win, so callers
+    may pass rows in file order. The ``MonthlySummary`` rollup is updated in
+    the same transaction, from the values each report had right before it
+    was replaced (on PostgreSQL read by the upsert itself, so concurrent
+    writers to the same keys cannot skew it).
+
+    Returns the set of ``(ngo_id, month)`` keys that already existed.
+    """
+    latest = _latest_by_key(values_list)
+    if not latest:
+        return set()
+
+    with transaction.atomic(savepoint=False):
+        if connection.vendor == 'postgresql':
+            existing = {
+                key: old for key, (_, _, _, old) in _upsert_reports_postgresql(latest).items() if old is not None
+            }
+        else:
+            # SQLite allows one writer at a time, and a transaction whose
+            # read went stale fails to write instead of writing over it
+            existing = {}
+            candidates = Report.objects.select_for_update().filter(
+                ngo_id__in={ngo_id for ngo_id, _ in latest},
+                month__in={month for _, month in latest},
+            ).values_list('ngo_id', 'month', 'people_helped', 'events_conducted', 'funds_utilized')
+            for ngo_id, month, *totals in candidates:
+                if (ngo_id, month) in latest:
+                    existing[(ngo_id, month)] = totals
+
+            Report.objects.bulk_create(
+                [Report(period=parse_month(values['month']), **values) for values in latest.values()],
+                update_conflicts=True,
+                unique_fields=['ngo_id', 'month'],
+                update_fields=UPSERT_UPDATE_FIELDS,
+            )
+
+        apply_report_changes(
+            (month, existing.get((ngo_id, month)),
+             (values['people_helped'], values['events_conducted'], values['funds_utilized']))
+            for (ngo_id, month), values in latest.items()
+        )
+
+    return set(existing)
+
+
+def upsert_report(values):
+    """Insert or update a single report and return ``(report, created)``.
+
+    On PostgreSQL the write is one ``UPSERT_REPORTS_SQL`` statement, so
+    concurrent submissions for the same ``(ngo_id, month)`` serialise on the
+    row lock instead of raising ``IntegrityError``. Other backends go
+    through ``upsert_reports``. The ``MonthlySummary`` rollup is updated in
+    the same transaction either way.
+    """
+    if connection.vendor != 'postgresql':
+        with transaction.atomic():
+            existing = upsert_reports([values])
+            report = Report.objects.get(ngo_id=values['ngo_id'], month=values['month'])
+        return report, not existing
+
+    new_totals = (values['people_helped'], values['events_conducted'], values['funds_utilized'])
+    with transaction.atomic():
+        [(report_id, created_at, updated_at, old_totals)] = _upsert_reports_postgresql(
+            {(values['ngo_id'], values['month']): values}
+        ).values()
+        apply_report_changes([(values['month'], old_totals, new_totals)])
+
+    report = Report(id=report_id, period=parse_month(values['month']), created_at=created_at, updated_at=updated_at, **{
+        field: values[field] for field in REQUIRED_FIELDS
+    })
+    return report, old_totals is None
+
+
+def _row_content(row):
+    """The part of a CSV row that determines what gets written."""
+    return '\x1f'.join(row.get(field) or '' for field in REQUIRED_FIELDS)
+
+
+def is_chunk_boundary(row, chunk_rows, batch_size):
+    """Whether a content-defined chunk ends after ``row``, the ``chunk_rows``-th row of the chunk.
+
+    Boundaries fall after rows whose content hashes to 0 modulo
+    ``batch_size`` (with a minimum of a quarter and a maximum of twice
+    ``batch_size`` rows), so inserting or deleting a few rows only changes
+    the chunks around the edit and the rest of the file keeps its chunk
+    digests.
+    """
+    if chunk_rows >= 2 * batch_size:
+        return True
+    if chunk_rows < max(batch_size // 4, 1):
+        return False
+    return zlib.crc32(_row_content(row).encode('utf-8')) % batch_size == 0
+
+
+def chunk_digest(chunk):
+    """SHA-256 of a chunk of ``(row_number, row)`` pairs.
+
+    The digest covers the required columns of every row in order, not the
+    row numbers, so the same rows hash the same wherever they sit in a file.
+    """
+    digest = hashlib.sha256()
+    for _, row in chunk:
+        digest.update(_row_content(row).encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+class IngestResult:
+    """Running totals for a bulk ingestion.
+
+    Memory stays bounded however many rows fail: ``errors`` keeps only the
+    first ``MAX_ERROR_SAMPLES`` ``(row_number, message)`` pairs in the order
+    they were found, and ``error_counts`` counts failures per error code.
+    Every error is also handed to ``error_log`` (see ``RowErrorLog``) when
+    one is given. ``stage_seconds`` adds up the time spent in each import
+    stage (see ``ingest_rows``).
+    """
+
+    MAX_ERROR_SAMPLES = 10
+
+    def __init__(self, error_log=None):
+        self.processed_rows = 0
+        self.successful_rows = 0
+        self.failed_rows = 0
+        self.skipped_rows = 0
+        self.errors = []
+        self.error_counts = {}
+        self.error_log = error_log
+        self.stage_seconds = {}
+
+    def add_error(self, error, row=None):
+        """Record a ``RowError`` for the CSV ``row`` (a dict) it came from."""
+        if len(self.errors) < self.MAX_ERROR_SAMPLES:
+            self.errors.append((error.row_number, error.message))
+        self.error_counts[error.code] = self.error_counts.get(error.code, 0) + 1
+        self.failed_rows += 1
+        if self.error_log is not None:
+            self.error_log.add(error, row)
+
+
+def _write_batch(batch, result):
+    """Write one batch of validated rows, falling back to row-by-row on failure.
+
+    ``batch`` is a list of ``(row_number, values, row)`` triples. If the
+    set-based upsert fails (e.g. a value overflows the column), each row is
+    retried in its own savepoint so the error is attributed to the row that
+    caused it.
+    """
+    if not batch:
+        return
+
+    try:
+        with transaction.atomic():
+            upsert_reports([values for _, values, _ in batch])
+        result.successful_rows += len(batch)
+        return
+    except Exception:
+        pass
+
+    for row_number, values, row in batch:
+        try:
+            with transaction.atomic():
+                upsert_reports([values])
+            result.successful_rows += 1
+        except Exception as e:
+            result.add_error(RowError(row_number, ERROR_WRITE_FAILED, f"Row {row_number}: {str(e)}"), row)
+
+
+def ingest_rows(rows, batch_size, on_batch=None, error_log=None, result=None, ledger=None):
+    """Validate and upsert CSV rows in batches of ``batch_size``.
+
+    ``rows`` is an iterable of ``(row_number, row)`` pairs, e.g.
+    ``enumerate(csv.DictReader(...), start=1)``. Each batch is validated
+    (``validate_rows``) and then written with a single multi-row upsert;
+    buffered ``error_log`` entries are written with it. ``on_batch(result)``
+    is called after every batch is committed.
+
+    With a ``ledger`` (see ``dedup.ChunkLedger``) batches are cut at
+    content-defined boundaries instead (``is_chunk_boundary``) and recorded
+    by digest. A batch whose digest an earlier upload applied is compared
+    with the stored reports first, and not written if they already match
+    (counted in ``skipped_rows``).
+
+    Pass an ``IngestResult`` as ``result`` to continue counting from an
+    earlier, interrupted run; ``error_log`` is then taken from it.
+
+    Each batch's stages are timed into ``metrics.IMPORT_STAGE_SECONDS`` and
+    ``result.stage_seconds``: ``parse`` (reading and decoding the rows),
+    ``validate``, ``write`` and ``error_log``.
+    """
+    if result is None:
+        result = IngestResult(error_log)
+    error_log = result.error_log
+    stages = result.stage_seconds
+    chunk = []
+    parse_started = time.perf_counter()
+
+    def write():
+        observe_stage('parse', time.perf_counter() - parse_started, stages)
+        known = False
+        if ledger is not None:
+            digest = chunk_digest(chunk)
+            known = ledger.is_known(digest)
+
+        failed_before = result.failed_rows
+        successful_before = result.successful_rows
+        batch = []
+        with stage_timer('validate', stages):
+            for row_number, row, values, error in validate_rows(chunk):
+                if error:
+                    result.add_error(error, row)
+                else:
+                    batch.append((row_number, values, row))
+        result.processed_rows += len(chunk)
+
+        with stage_timer('write', stages):
+            if known and batch and stored_reports_match([values for _, values, _ in batch]):
+                # An earlier upload applied these rows and nothing has changed them since
+                result.successful_rows += len(batch)
+                result.skipped_rows += len(batch)
+            else:
+                _write_batch(batch, result)
+        if error_log is not None:
+            with stage_timer('error_log', stages):
+                error_log.flush()
+        if settings.METRICS_ENABLED:
+            IMPORT_ROWS.inc(result.successful_rows - successful_before, 'successful')
+            IMPORT_ROWS.inc(result.failed_rows - failed_before, 'failed')
+        if ledger is not None:
+            months = sorted({values['month'] for _, values, _ in batch})
+            ledger.record(digest, months, len(chunk), result.failed_rows - failed_before)
+            ledger.flush()
+        if on_batch:
+            on_batch(result)
+
+    for item in rows:
+        chunk.append(item)
+        if (is_chunk_boundary(item[1], len(chunk), batch_size) if ledger is not None
+                else len(chunk) == batch_size):
+            write()
+            chunk = []
+            parse_started = time.perf_counter()
+
+    if chunk:
+        write()
+
+    return result
+
+
+def shard_for_key(ngo_id, month, shards):
+    """Pick a shard for ``(ngo_id, month)`` with a hash that is stable across processes."""
+    return zlib.crc32(f'{ngo_id}\x1f{month}'.encode('utf-8')) % shards
+
+
+def split_csv_into_shards(file, name, shards):
+    """Split a CSV into up to ``shards`` files in the spool directory.
+
+    Rows are routed by ``(ngo_id, month)``, with the month normalised as
+    validation will store it, so every row for a key lands in the same
+    shard, in file order, keeping last-writer-wins deterministic. Each
+    shard gets an extra leading ``SHARD_ROW_FIELD`` column holding the
+    row's number in the original file. Returns the paths of non-empty shards.
+    """
+    reader = csv.reader(iter_decoded_lines(file.chunks()))
+    header = next(reader, None)
+    if header is None:
+        return []
+
+    ngo_idx = header.index('ngo_id') if 'ngo_id' in header else None
+    month_idx = header.index('month') if 'month' in header else None
+
+    os.makedirs(settings.BULK_UPLOAD_SPOOL_DIR, exist_ok=True)
+    paths = {}
+    handles = {}
+    writers = {}
+    row_number = 0
+    try:
+        for row in reader:
+            if not row:
+                continue  # csv.DictReader skips blank lines without numbering them
+            row_number += 1
+
+            ngo_id = row[ngo_idx] if ngo_idx is not None and ngo_idx < len(row) else ''
+            month = row[month_idx] if month_idx is not None and month_idx < len(row) else ''
+            try:
+                month = normalize_month(month)  # '2024-1' and '2024-01' are the same report
+            except ValueError:
+                pass  # Rejected by validation in whichever shard it lands
+            shard = shard_for_key(ngo_id, month, shards)
+
+            if shard not in writers:
+                paths[shard] = os.path.join(settings.BULK_UPLOAD_SPOOL_DIR, f'{name}.shard{shard}.csv')
+                handles[shard] = open(paths[shard], 'w', newline='', encoding='utf-8')
+                writers[shard] = csv.writer(handles[shard])
+                writers[shard].writerow([SHARD_ROW_FIELD] + header)
+            writers[shard].writerow([row_number] + row)
+    finally:
+        for handle in handles.values():
+            handle.close()
+
+    return [paths[shard] for shard in sorted(paths)]
+
+
+def iter_shard_rows(shard_file):
+    """Yield ``(row_number, row)`` pairs from a shard written by ``split_csv_into_shards``."""
+    for row in csv.DictReader(shard_file):
+        yield int(row.pop(SHARD_ROW_FIELD)), row
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reports.periods import backfill_periods, canonicalize_months
+from reports.summaries import rebuild_monthly_summaries
+
+
+class Command(BaseCommand):
+    help = 'Set Report.period on reports written without it, rewriting their months as YYYY-MM.'
+
+    def handle(self, *args, **options):
+        merged = canonicalize_months()
+        if merged:
+            rebuild_monthly_summaries()
+            self.stdout.write(f'Rewrote {merged} reports stored under non-canonical months')
+        count = backfill_periods()
+        self.stdout.write(self.style.SUCCESS(f'Set period on {count} reports'))
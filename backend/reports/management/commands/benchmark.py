@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+import json
+
+from reports.benchmarks import SCENARIOS, environment, run_scenario
+
+
+class Command(BaseCommand):
+    help = 'Run reports hot-path benchmarks at one or more row counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', choices=[[]] + sorted(SCENARIOS),
+                            help='Scenarios to run (default: all).')
+        parser.add_argument('--rows', nargs='+', type=int, default=[1000, 10000, 100000],
+                            help='Row counts to benchmark (default: 1000 10000 100000).')
+        parser.add_argument('--json', metavar='PATH',
+                            help='Also write the environment and all results to PATH as JSON.')
+
+    def handle(self, *args, **options):
+        run = {'environment': environment(), 'results': []}
+        for name in options['scenarios'] or sorted(SCENARIOS):
+            for rows in options['rows']:
+                result = run_scenario(name, rows)
+                run['results'].append({'scenario': name, 'rows': rows, **result})
+                details = ', '.join(f'{key}={value}' for key, value in result.items())
+                self.stdout.write(f'{name} rows={rows}: {details}')
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as output:
+                json.dump(run, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {len(run["results"])} results to {options["json"]}'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reports.tasks import discard_failed_uploads
+
+
+class Command(BaseCommand):
+    help = 'Remove spooled files of failed bulk upload jobs past their retention (for cron when celery beat is not running).'
+
+    def handle(self, *args, **options):
+        count = discard_failed_uploads()
+        self.stdout.write(self.style.SUCCESS(f'Removed {count} spooled uploads of failed jobs'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reports.summaries import rebuild_monthly_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the MonthlySummary rollup table from all reports.'
+
+    def handle(self, *args, **options):
+        count = rebuild_monthly_summaries()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} monthly summaries'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reports.tasks import requeue_stalled_uploads
+
+
+class Command(BaseCommand):
+    help = 'Resume bulk upload jobs that stopped making progress (for cron when celery beat is not running).'
+
+    def handle(self, *args, **options):
+        count = requeue_stalled_uploads()
+        self.stdout.write(self.style.SUCCESS(f'Resumed {count} stalled upload jobs'))
@@ -0,0 +1,251 @@
+"""In-process metrics, exposed in the Prometheus text format at ``/metrics``.
+
+``MetricsMiddleware`` records per-view latency, database queries and time,
+and response size; the importer records how long each stage of a batch
+takes (``stage_timer``). Values live in the memory of the process that
+recorded them, so every web process is scraped on its own. Imports run on
+Celery workers also log their stage totals when they finish.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from contextlib import ExitStack, contextmanager
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic per-label-set totals."""
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labels, label_values), value
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set."""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._values = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            values = {label_values: list(state) for label_values, state in self._values.items()}
+        for label_values, state in sorted(values.items()):
+            for bound, count in zip(self.buckets, state):
+                labels = _format_labels(self.labels + ('le',), label_values + (_format_value(float(bound)),))
+                yield f'{self.name}_bucket', labels, count
+            yield f'{self.name}_bucket', _format_labels(self.labels + ('le',), label_values + ('+Inf',)), state[-1]
+            yield f'{self.name}_sum', _format_labels(self.labels, label_values), state[-2]
+            yield f'{self.name}_count', _format_labels(self.labels, label_values), state[-1]
+
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Time to produce a response, by view.',
+                            labels=('view', 'method', 'status'))
+REQUEST_QUERIES = Counter('http_request_db_queries_total', 'Database queries executed while handling requests.',
+                          labels=('view',))
+REQUEST_DB_SECONDS = Counter('http_request_db_seconds_total', 'Time spent in database queries while handling requests.',
+                             labels=('view',))
+RESPONSE_BYTES = Counter('http_response_bytes_total', 'Response body bytes sent, by view.', labels=('view',))
+IMPORT_STAGE_SECONDS = Histogram('import_stage_seconds', 'Time per batch spent in each bulk import stage.',
+                                 labels=('stage',))
+IMPORT_ROWS = Counter('import_rows_total', 'Bulk import rows processed, by outcome.', labels=('outcome',))
+
+REGISTRY = [REQUEST_SECONDS, REQUEST_QUERIES, REQUEST_DB_SECONDS, RESPONSE_BYTES, IMPORT_STAGE_SECONDS, IMPORT_ROWS]
+
+
+def render_metrics():
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.help_text}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{labels} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def stage_timer(stage, totals=None):
+    """Time an import stage into ``IMPORT_STAGE_SECONDS`` (and ``totals[stage]``, if given)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start, totals)
+
+
+def observe_stage(stage, seconds, totals=None):
+    if settings.METRICS_ENABLED:
+        IMPORT_STAGE_SECONDS.observe(seconds, stage)
+    if totals is not None:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+
+
+class _QueryTimer:
+    """``execute_wrapper`` hook that counts queries and their total time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Records latency, database queries and time, and response size per view.
+
+    Requests slower than ``METRICS_SLOW_REQUEST_MS`` are logged as warnings;
+    with the ``reports.metrics`` logger at DEBUG every request is logged.
+    Streaming responses are measured once their content has been sent.
+
+    Under ASGI, views run their queries on other threads than this
+    middleware, so requests there record latency and size, and only the
+    queries made while a sync streaming response is sent.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        queries = _QueryTimer()
+        start = time.perf_counter()
+        with self._timing_queries(queries):
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        if response.streaming:
+            response.streaming_content = self._measure_stream(
+                response.streaming_content, request, response, view, queries, start)
+        else:
+            self._record(request, response, view, queries, start, len(response.content))
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        response = await self.get_response(request)
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        if response.streaming and response.is_async:
+            response.streaming_content = self._ameasure_stream(
+                response.streaming_content, request, response, view, start)
+        elif response.streaming:
+            response.streaming_content = self._measure_stream(
+                response.streaming_content, request, response, view, _QueryTimer(), start)
+        else:
+            self._record(request, response, view, None, start, len(response.content))
+        return response
+
+    @staticmethod
+    @contextmanager
+    def _timing_queries(queries):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            yield
+
+    def _measure_stream(self, content, request, response, view, queries, start):
+        sent = 0
+        try:
+            with self._timing_queries(queries):  # Streamed content may still query (e.g. server-side cursors)
+                for chunk in content:
+                    sent += len(chunk)
+                    yield chunk
+        finally:
+            self._record(request, response, view, queries, start, sent)
+
+    async def _ameasure_stream(self, content, request, response, view, start):
+        sent = 0
+        try:
+            async for chunk in content:
+                sent += len(chunk)
+                yield chunk
+        finally:
+            self._record(request, response, view, None, start, sent)
+
+    def _record(self, request, response, view, queries, start, size):
+        """Record one request; ``queries`` is ``None`` when they could not be observed."""
+        seconds = time.perf_counter() - start
+        REQUEST_SECONDS.observe(seconds, view, request.method, response.status_code)
+        if queries is not None:
+            REQUEST_QUERIES.inc(queries.count, view)
+            REQUEST_DB_SECONDS.inc(queries.seconds, view)
+        RESPONSE_BYTES.inc(size, view)
+
+        level = logging.WARNING if seconds * 1000 >= settings.METRICS_SLOW_REQUEST_MS else logging.DEBUG
+        if logger.isEnabledFor(level):
+            logger.log(level, 'request view=%s method=%s status=%s duration_ms=%.1f queries=%s db_ms=%s bytes=%d',
+                       view, request.method, response.status_code, seconds * 1000,
+                       '-' if queries is None else queries.count,
+                       '-' if queries is None else f'{queries.seconds * 1000:.1f}', size)
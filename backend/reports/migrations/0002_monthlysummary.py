@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:48
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_monthly_summaries(apps, schema_editor):
+    Report = apps.get_model('reports', 'Report')
+    MonthlySummary = apps.get_model('reports', 'MonthlySummary')
+    db_alias = schema_editor.connection.alias
+    rows = Report.objects.using(db_alias).values('month').annotate(
+        total_ngos_reporting=Count('ngo_id', distinct=True),
+        total_people_helped=Sum('people_helped'),
+        total_events_conducted=Sum('events_conducted'),
+        total_funds_utilized=Sum('funds_utilized'),
+    ).order_by('month')
+    MonthlySummary.objects.using(db_alias).bulk_create([MonthlySummary(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySummary',
+            fields=[
+                ('month', models.CharField(help_text='Format: YYYY-MM', max_length=7, primary_key=True, serialize=False)),
+                ('total_ngos_reporting', models.IntegerField(default=0)),
+                ('total_people_helped', models.BigIntegerField(default=0)),
+                ('total_events_conducted', models.BigIntegerField(default=0)),
+                ('total_funds_utilized', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'monthly summaries',
+            },
+        ),
+        migrations.RunPython(populate_monthly_summaries, migrations.RunPython.noop),
+    ]
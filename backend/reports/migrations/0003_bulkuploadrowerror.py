@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_monthlysummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkuploadjob',
+            name='error_counts',
+            field=models.JSONField(blank=True, default=dict, help_text='Failed rows per error code'),
+        ),
+        migrations.CreateModel(
+            name='BulkUploadRowError',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_number', models.IntegerField()),
+                ('code', models.CharField(max_length=50)),
+                ('field', models.CharField(blank=True, max_length=100)),
+                ('raw_value', models.TextField(blank=True)),
+                ('message', models.TextField()),
+                ('raw_row', models.JSONField(default=dict, help_text='The row as it appeared in the CSV')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='row_errors', to='reports.bulkuploadjob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'row_number'], name='reports_bul_job_id_ee8a97_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_bulkuploadrowerror'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkuploadjob',
+            name='checkpoint_row',
+            field=models.IntegerField(default=0, help_text='Rows whose batches are committed; resuming starts after it'),
+        ),
+        migrations.AddField(
+            model_name='bulkuploadjob',
+            name='file_path',
+            field=models.CharField(blank=True, help_text='Spooled upload, kept until the job completes', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='bulkuploadjob',
+            name='resume_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='bulkuploadjob',
+            index=models.Index(fields=['status', 'updated_at'], name='reports_bul_status_e6d524_idx'),
+        ),
+    ]
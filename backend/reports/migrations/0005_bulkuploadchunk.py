@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_bulkuploadjob_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkuploadjob',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the uploaded file', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='bulkuploadjob',
+            name='skipped_rows',
+            field=models.IntegerField(default=0, help_text='Valid rows not written because the stored reports already matched'),
+        ),
+        migrations.CreateModel(
+            name='BulkUploadChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(db_index=True, max_length=64)),
+                ('row_count', models.IntegerField()),
+                ('failed_rows', models.IntegerField(default=0)),
+                ('months', models.JSONField(default=list)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='reports.bulkuploadjob')),
+            ],
+        ),
+    ]
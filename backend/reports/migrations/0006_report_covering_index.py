@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0005_bulkuploadchunk'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='report',
+            name='reports_rep_ngo_id_2651eb_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='report',
+            name='reports_rep_month_67cfb8_idx',
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='month',
+            field=models.CharField(help_text='Format: YYYY-MM', max_length=7),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='ngo_id',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['month', 'ngo_id'], include=('people_helped', 'events_conducted', 'funds_utilized'), name='reports_month_covering_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:17
+
+from django.db import migrations, models
+from datetime import datetime
+
+
+def backfill_periods(apps, schema_editor):
+    Report = apps.get_model('reports', 'Report')
+    db_alias = schema_editor.connection.alias
+    months = Report.objects.using(db_alias).filter(period__isnull=True).values_list('month', flat=True).distinct()
+    for month in list(months.order_by()):
+        try:
+            period = datetime.strptime(month, '%Y-%m').date()
+        except ValueError:
+            continue
+        Report.objects.using(db_alias).filter(period__isnull=True, month=month).update(period=period)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_report_covering_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='report',
+            name='reports_month_covering_idx',
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='period',
+            field=models.DateField(blank=True, editable=False, help_text='First day of month; set from month', null=True),
+        ),
+        migrations.RunPython(backfill_periods, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['period', 'ngo_id'], include=('people_helped', 'events_conducted', 'funds_utilized'), name='reports_period_covering_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(condition=models.Q(('period__isnull', True)), fields=['month'], name='reports_unset_period_idx'),
+        ),
+    ]
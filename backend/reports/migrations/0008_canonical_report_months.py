@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:15
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from datetime import datetime
+
+
+def canonicalize_months(apps, schema_editor):
+    """Rewrite months stored as given by older importers (``2024-3``) to ``YYYY-MM``.
+
+    Reports that exist under both spellings are merged, keeping the copy
+    written last, and the ``MonthlySummary`` rollup is rebuilt.
+    """
+    Report = apps.get_model('reports', 'Report')
+    MonthlySummary = apps.get_model('reports', 'MonthlySummary')
+    db_alias = schema_editor.connection.alias
+    reports = Report.objects.using(db_alias)
+
+    changed = False
+    for month in list(reports.values_list('month', flat=True).distinct().order_by()):
+        try:
+            period = datetime.strptime(month, '%Y-%m').date()
+        except ValueError:
+            continue
+        canonical = f'{period.year:04d}-{period.month:02d}'
+        if canonical == month:
+            continue
+        legacy = reports.filter(month=month)
+        for current in reports.filter(month=canonical, ngo_id__in=legacy.values('ngo_id')):
+            old = legacy.get(ngo_id=current.ngo_id)
+            (current if (old.updated_at, old.pk) > (current.updated_at, current.pk) else old).delete()
+        legacy.update(month=canonical, period=period)
+        changed = True
+
+    if changed:
+        rows = reports.values('month').annotate(
+            total_ngos_reporting=Count('ngo_id', distinct=True),
+            total_people_helped=Sum('people_helped'),
+            total_events_conducted=Sum('events_conducted'),
+            total_funds_utilized=Sum('funds_utilized'),
+        ).order_by('month')
+        MonthlySummary.objects.using(db_alias).all().delete()
+        MonthlySummary.objects.using(db_alias).bulk_create([MonthlySummary(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0007_report_period'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize_months, migrations.RunPython.noop),
+    ]
@@ -2,11 +2,14 @@ from django.db import models
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 
+from .periods import normalize_month, parse_month
+
 
 class Report(models.Model):
     """Monthly report submitted by an NGO."""
-    ngo_id = models.CharField(max_length=100, db_index=True)
-    month = models.CharField(max_length=7, help_text="Format: YYYY-MM", db_index=True)
+    ngo_id = models.CharField(max_length=100)
+    month = models.CharField(max_length=7, help_text="Format: YYYY-MM")
+    period = models.DateField(null=True, blank=True, editable=False, help_text="First day of month; set from month")
     people_helped = models.IntegerField(validators=[MinValueValidator(0)])
     events_conducted = models.IntegerField(validators=[MinValueValidator(0)])
     funds_utilized = models.DecimalField(max_digits=15, decimal_places=2, validators=[MinValueValidator(0)])
@@ -14,16 +17,51 @@ class Report(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = [['ngo_id', 'month']]  # Ensures idempotency
+        unique_together = [['ngo_id', 'month']]  # Ensures idempotency; also serves ngo_id lookups
         indexes = [
-            models.Index(fields=['ngo_id', 'month']),
-            models.Index(fields=['month']),
+            # Month pages (ordered by ngo_id) and month-range sums read only this
+            # index on PostgreSQL; other backends build it without the INCLUDE
+            models.Index(
+                fields=['period', 'ngo_id'],
+                include=['people_helped', 'events_conducted', 'funds_utilized'],
+                name='reports_period_covering_idx',
+            ),
+            # Month lookups for rows without a period (see reports.periods)
+            models.Index(fields=['month'], condition=models.Q(period__isnull=True), name='reports_unset_period_idx'),
         ]
 
+    def save(self, *args, **kwargs):
+        try:
+            self.month = normalize_month(self.month)  # The (ngo_id, month) key is always YYYY-MM
+            self.period = parse_month(self.month)
+        except (TypeError, ValueError):
+            self.period = None
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.ngo_id} - {self.month}"
 
 
+class MonthlySummary(models.Model):
+    """Precomputed dashboard totals for one month.
+
+    Kept up to date incrementally whenever reports are written; rebuild it
+    with ``python manage.py rebuild_monthly_summaries``.
+    """
+    month = models.CharField(max_length=7, primary_key=True, help_text="Format: YYYY-MM")
+    total_ngos_reporting = models.IntegerField(default=0)
+    total_people_helped = models.BigIntegerField(default=0)
+    total_events_conducted = models.BigIntegerField(default=0)
+    total_funds_utilized = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'monthly summaries'
+
+    def __str__(self):
+        return f"Summary {self.month}"
+
+
 class BulkUploadJob(models.Model):
     """Tracks bulk CSV upload processing jobs."""
     STATUS_CHOICES = [
@@ -39,10 +77,57 @@ class BulkUploadJob(models.Model):
     processed_rows = models.IntegerField(default=0)
     successful_rows = models.IntegerField(default=0)
     failed_rows = models.IntegerField(default=0)
+    skipped_rows = models.IntegerField(default=0, help_text="Valid rows not written because the stored reports already matched")
     error_message = models.TextField(blank=True, null=True)
+    error_counts = models.JSONField(default=dict, blank=True, help_text="Failed rows per error code")
+    file_path = models.CharField(max_length=500, blank=True, help_text="Spooled upload, kept until the job completes")
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the uploaded file")
+    checkpoint_row = models.IntegerField(default=0, help_text="Rows whose batches are committed; resuming starts after it")
+    resume_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
     def __str__(self):
         return f"Job {self.job_id} - {self.status}"
 
+
+class BulkUploadChunk(models.Model):
+    """A chunk of rows processed by a bulk upload job, identified by a hash of its content.
+
+    Later uploads skip writing chunks with the same ``digest`` that an
+    earlier completed job applied without errors, once they have checked
+    that the stored reports still match.
+    """
+    job = models.ForeignKey(BulkUploadJob, on_delete=models.CASCADE, related_name='chunks')
+    digest = models.CharField(max_length=64, db_index=True)
+    row_count = models.IntegerField()
+    failed_rows = models.IntegerField(default=0)
+    months = models.JSONField(default=list)
+
+    def __str__(self):
+        return f"Job {self.job_id} chunk {self.digest[:12]}"
+
+
+class BulkUploadRowError(models.Model):
+    """A CSV row rejected by a bulk upload job."""
+    job = models.ForeignKey(BulkUploadJob, on_delete=models.CASCADE, related_name='row_errors')
+    row_number = models.IntegerField()
+    code = models.CharField(max_length=50)
+    field = models.CharField(max_length=100, blank=True)
+    raw_value = models.TextField(blank=True)
+    message = models.TextField()
+    raw_row = models.JSONField(default=dict, help_text="The row as it appeared in the CSV")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['job', 'row_number']),
+        ]
+
+    def __str__(self):
+        return f"Job {self.job_id} row {self.row_number}: {self.code}"
+
@@ -0,0 +1,87 @@
+from rest_framework.settings import api_settings
+from operator import attrgetter
+import base64
+import binascii
+
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(value):
+    """Encode the last sort key of a page (e.g. its ``ngo_id``) as an opaque cursor."""
+    return base64.urlsafe_b64encode(str(value).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by ``encode_cursor``. Raises ``ValueError`` if malformed."""
+    try:
+        # Strict decoding: characters outside the alphabet make it fail instead of being dropped
+        return base64.b64decode(cursor.encode('ascii'), altchars=b'-_', validate=True).decode('utf-8')
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def parse_page_size(value):
+    """Parse a ``page_size`` query parameter, defaulting to ``REST_FRAMEWORK['PAGE_SIZE']``."""
+    if not value:
+        return api_settings.PAGE_SIZE
+    try:
+        page_size = int(value)
+    except ValueError:
+        page_size = 0
+    if page_size < 1:
+        raise ValueError('page_size must be a positive integer')
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+def _keyset_query(queryset, field, cursor, page_size):
+    """The query for one keyset page, with one extra row to tell whether another page follows."""
+    if cursor:
+        try:
+            queryset = queryset.filter(**{f'{field}__gt': decode_cursor(cursor)})
+        except (TypeError, ValueError) as e:
+            raise ValueError('Invalid cursor') from e
+    return queryset.order_by(field)[:page_size + 1]
+
+
+def _keyset_page(rows, field, page_size, key):
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    return rows, encode_cursor((key or attrgetter(field))(rows[-1]))
+
+
+def paginate_keyset(queryset, field, cursor=None, page_size=None, key=None):
+    """Return one keyset page of ``queryset`` ordered by the unique column ``field``.
+
+    Seeks past ``cursor`` with ``field > last`` instead of an OFFSET, so
+    every page costs the same however deep it is (given an index on
+    ``field``). ``key`` extracts the sort value from a row and defaults to
+    ``attrgetter(field)``. Returns ``(rows, next_cursor)``; ``next_cursor``
+    is ``None`` on the last page.
+    """
+    page_size = page_size or api_settings.PAGE_SIZE
+    rows = list(_keyset_query(queryset, field, cursor, page_size))
+    return _keyset_page(rows, field, page_size, key)
+
+
+async def apaginate_keyset(queryset, field, cursor=None, page_size=None, key=None):
+    """Async ``paginate_keyset``, for async views."""
+    page_size = page_size or api_settings.PAGE_SIZE
+    rows = [row async for row in _keyset_query(queryset, field, cursor, page_size)]
+    return _keyset_page(rows, field, page_size, key)
+
+
+def paginate_reports(queryset, cursor=None, page_size=None, key=attrgetter('ngo_id')):
+    """Return one keyset page of a month's reports ordered by ``ngo_id``.
+
+    Uses the ``(period, ngo_id)`` index; ``key`` extracts the ``ngo_id`` from
+    a row (for ``values_list`` querysets). See ``paginate_keyset``.
+    """
+    return paginate_keyset(queryset, 'ngo_id', cursor=cursor, page_size=page_size, key=key)
+
+
+async def apaginate_reports(queryset, cursor=None, page_size=None, key=attrgetter('ngo_id')):
+    """Async ``paginate_reports``, for async views."""
+    return await apaginate_keyset(queryset, 'ngo_id', cursor=cursor, page_size=page_size, key=key)
@@ -0,0 +1,127 @@
+"""``YYYY-MM`` month strings and the native ``Report.period`` column.
+
+The API, CSV files and ``MonthlySummary`` keep using ``YYYY-MM`` strings.
+``Report.period`` stores the same month as its first day, so range queries
+compare dates instead of strings. ``Report.month`` is still written next to
+it for a compatibility period: with ``REPORT_PERIOD_FALLBACK`` on, lookups
+also match rows whose ``period`` is not set yet (written by a process that
+predates the column). Run ``manage.py backfill_report_periods`` before
+turning it off.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from datetime import datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def parse_month(value):
+    """Parse a ``YYYY-MM`` string into the first day of that month.
+
+    Raises ``ValueError`` if ``value`` is not a valid month.
+    """
+    return datetime.strptime(value, '%Y-%m').date()
+
+
+def format_month(period):
+    """The ``YYYY-MM`` string for a ``date``."""
+    return f'{period.year:04d}-{period.month:02d}'
+
+
+@lru_cache(maxsize=4096)
+def normalize_month(value):
+    """Canonical ``YYYY-MM`` spelling of a month (``2024-1`` becomes ``2024-01``)."""
+    return format_month(parse_month(value))
+
+
+def _month_conditions(month):
+    return Q(period=parse_month(month)), Q(period__isnull=True, month=month)
+
+
+def _with_fallback(condition, unset):
+    """Add ``unset`` (rows without a period) to ``condition`` if the fallback is on and any exist.
+
+    The existence check only reads the small partial index on rows without
+    a period; leaving the ``OR`` out otherwise keeps month pages on the
+    ``(period, ngo_id)`` index order.
+    """
+    from .models import Report
+
+    if settings.REPORT_PERIOD_FALLBACK and Report.objects.filter(unset).exists():
+        return condition | unset
+    return condition
+
+
+async def _awith_fallback(condition, unset):
+    """Async ``_with_fallback``."""
+    from .models import Report
+
+    if settings.REPORT_PERIOD_FALLBACK and await Report.objects.filter(unset).aexists():
+        return condition | unset
+    return condition
+
+
+def month_filter(month):
+    """``Q`` matching the reports for one canonical ``YYYY-MM`` month."""
+    return _with_fallback(*_month_conditions(month))
+
+
+async def amonth_filter(month):
+    """Async ``month_filter``, for async views."""
+    return await _awith_fallback(*_month_conditions(month))
+
+
+def month_range_filter(start, end):
+    """``Q`` matching the reports from ``start`` to ``end`` (canonical ``YYYY-MM``) inclusive."""
+    return _with_fallback(
+        Q(period__range=(parse_month(start), parse_month(end))),
+        Q(period__isnull=True, month__gte=start, month__lte=end),
+    )
+
+
+def canonicalize_months():
+    """Rewrite reports stored under a non-canonical month (``2024-3``) to ``YYYY-MM``.
+
+    Older importers stored months as given. A report that also exists under
+    the canonical spelling is merged into one, keeping the copy written
+    last. Returns the number of reports rewritten or removed; rebuild the
+    ``MonthlySummary`` rollup afterwards if it is not 0.
+    """
+    from .models import Report
+
+    changed = 0
+    months = Report.objects.values_list('month', flat=True).distinct()
+    for month in list(months.order_by()):
+        try:
+            canonical = normalize_month(month)
+        except ValueError:
+            continue
+        if canonical == month:
+            continue
+        with transaction.atomic():
+            legacy = Report.objects.filter(month=month)
+            for current in Report.objects.filter(month=canonical, ngo_id__in=legacy.values('ngo_id')):
+                old = legacy.get(ngo_id=current.ngo_id)
+                (current if (old.updated_at, old.pk) > (current.updated_at, current.pk) else old).delete()
+                changed += 1
+            changed += legacy.update(month=canonical, period=parse_month(canonical))
+    return changed
+
+
+def backfill_periods():
+    """Set ``period`` on reports that lack it, one ``UPDATE`` per month. Returns the rows updated.
+
+    Rows whose ``month`` does not parse are left alone.
+    """
+    from .models import Report
+
+    updated = 0
+    months = Report.objects.filter(period__isnull=True).values_list('month', flat=True).distinct()
+    for month in list(months.order_by()):
+        try:
+            period = parse_month(month)
+        except ValueError:
+            continue
+        updated += Report.objects.filter(period__isnull=True, month=month).update(period=period)
+    return updated
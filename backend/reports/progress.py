@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+import time
+
+from .models import BulkUploadJob
+from .cache import invalidate_job_status
+from .metrics import stage_timer
+
+
+class ProgressReporter:
+    """Coalesces progress updates for a ``BulkUploadJob``.
+
+    Counters are written at most once every ``every_rows`` processed rows or
+    every ``interval_ms`` milliseconds, whichever comes first, with a single
+    ``UPDATE`` that only touches the counter columns (plus ``updated_at``).
+    Call ``flush()`` when the import finishes or fails to persist the final
+    counts.
+
+    Because ``update()`` is only called once a batch has committed, each
+    flush also records the processed row count as the job's
+    ``checkpoint_row`` (together with ``error_counts``), in the same
+    ``UPDATE`` as the counters it matches. A resumed import starts from there.
+
+    With ``incremental=True`` the reporter tracks one shard of a job and adds
+    its counts to the job's columns (``F() + delta``) instead of overwriting
+    them, so several shards can report into the same job concurrently.
+
+    Flushes are timed as the ``progress_flush`` import stage, into the
+    ``stage_seconds`` of the last ``IngestResult`` passed to ``update()``.
+    """
+
+    def __init__(self, job, every_rows=None, interval_ms=None, incremental=False):
+        self.job = job
+        self.every_rows = every_rows or settings.BULK_UPLOAD_PROGRESS_EVERY_ROWS
+        self.interval = (interval_ms if interval_ms is not None else settings.BULK_UPLOAD_PROGRESS_INTERVAL_MS) / 1000
+        self.incremental = incremental
+        if incremental:
+            self.processed_rows = self.successful_rows = self.failed_rows = self.skipped_rows = 0
+        else:
+            self.processed_rows = job.processed_rows
+            self.successful_rows = job.successful_rows
+            self.failed_rows = job.failed_rows
+            self.skipped_rows = job.skipped_rows
+        self.error_counts = None
+        self.stage_seconds = None
+        self._flushed = (self.processed_rows, self.successful_rows, self.failed_rows)
+        self._flushed_at = time.monotonic()
+
+    def update(self, result):
+        """Record the latest counts from an ``IngestResult``, flushing if due."""
+        self.processed_rows = result.processed_rows
+        self.successful_rows = result.successful_rows
+        self.failed_rows = result.failed_rows
+        self.skipped_rows = result.skipped_rows
+        self.error_counts = dict(result.error_counts)  # As of this batch; the result keeps counting
+        self.stage_seconds = result.stage_seconds
+
+        if (self.processed_rows - self._flushed[0] >= self.every_rows
+                or time.monotonic() - self._flushed_at >= self.interval):
+            self.flush()
+
+    def flush(self):
+        """Write the current counters to the database."""
+        with stage_timer('progress_flush', self.stage_seconds):
+            self._write()
+
+    def _write(self):
+        if self.incremental:
+            flushed_processed, flushed_successful, flushed_failed = self._flushed
+            counters = {
+                'processed_rows': F('processed_rows') + (self.processed_rows - flushed_processed),
+                'successful_rows': F('successful_rows') + (self.successful_rows - flushed_successful),
+                'failed_rows': F('failed_rows') + (self.failed_rows - flushed_failed),
+            }
+        else:
+            counters = {
+                'processed_rows': self.processed_rows,
+                'successful_rows': self.successful_rows,
+                'failed_rows': self.failed_rows,
+                'checkpoint_row': self.processed_rows,
+                'skipped_rows': self.skipped_rows,
+            }
+            if self.error_counts is not None:
+                counters['error_counts'] = self.error_counts
+            self.job.processed_rows = self.processed_rows
+            self.job.successful_rows = self.successful_rows
+            self.job.failed_rows = self.failed_rows
+            self.job.skipped_rows = self.skipped_rows
+
+        BulkUploadJob.objects.filter(pk=self.job.pk).update(updated_at=timezone.now(), **counters)
+        invalidate_job_status(self.job.job_id)
+        self._flushed = (self.processed_rows, self.successful_rows, self.failed_rows)
+        self._flushed_at = time.monotonic()
@@ -0,0 +1,100 @@
+"""Read-replica routing for the read-only endpoints.
+
+Reads go to the ``replica`` database only inside ``replica_reads()``, which
+the dashboard, listing, export and job status views wrap around their
+queries; everything else (writes, and reads that must see them) stays on
+``default``. Writes record the months and jobs they touched when they
+commit (``mark_written``), and ``replica_reads`` falls back to ``default``
+for any of those written in the last ``REPLICA_LAG_SECONDS``, so a fresh
+write is not served stale (or cached stale) from a lagging replica.
+
+Marks are kept in the cache, so set ``CACHE_URL`` to share them between
+processes.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+REPLICA = 'replica'
+
+_reading_from_replica = ContextVar('reading_from_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def month_key(month):
+    return f'month:{month}'
+
+
+def job_key(job_id):
+    return f'job:{job_id}'
+
+
+def _written_key(key):
+    return f'replica:written:{key}'
+
+
+def mark_written(keys):
+    """Record that ``keys`` (``month_key``/``job_key``) were just written on the primary.
+
+    Call once the write has committed.
+    """
+    if replica_configured() and settings.REPLICA_LAG_SECONDS > 0:
+        cache.set_many({_written_key(key): True for key in keys}, settings.REPLICA_LAG_SECONDS)
+
+
+def recently_written(keys):
+    """Whether any of ``keys`` was written within the last ``REPLICA_LAG_SECONDS``."""
+    keys = [_written_key(key) for key in keys]
+    return bool(keys) and settings.REPLICA_LAG_SECONDS > 0 and bool(cache.get_many(keys))
+
+
+async def arecently_written(keys):
+    """Async ``recently_written``."""
+    keys = [_written_key(key) for key in keys]
+    return bool(keys) and settings.REPLICA_LAG_SECONDS > 0 and bool(await cache.aget_many(keys))
+
+
+@contextmanager
+def replica_reads(keys=()):
+    """Route reads in this block to the replica, unless any of ``keys`` was just written.
+
+    Yields the alias reads go to. Querysets evaluated after the block (e.g.
+    while a response streams) must be pinned with ``.using()`` inside it.
+    """
+    use_replica = replica_configured() and not recently_written(keys)
+    token = _reading_from_replica.set(use_replica)
+    try:
+        yield REPLICA if use_replica else DEFAULT_DB_ALIAS
+    finally:
+        _reading_from_replica.reset(token)
+
+
+@asynccontextmanager
+async def areplica_reads(keys=()):
+    """Async ``replica_reads``; the choice carries over to the async ORM's worker threads."""
+    use_replica = replica_configured() and not await arecently_written(keys)
+    token = _reading_from_replica.set(use_replica)
+    try:
+        yield REPLICA if use_replica else DEFAULT_DB_ALIAS
+    finally:
+        _reading_from_replica.reset(token)
+
+
+class ReplicaRouter:
+    """Sends reads inside ``replica_reads()`` to the replica and all writes to ``default``."""
+
+    def db_for_read(self, model, **hints):
+        if _reading_from_replica.get():
+            return REPLICA
+        return None  # The instance's own database, or default
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Both aliases hold the same data
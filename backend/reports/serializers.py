@@ -1,5 +1,11 @@
 from rest_framework import serializers
-from .models import Report, BulkUploadJob
+from django.utils import timezone
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+import json
+
+from .models import Report, BulkUploadJob, BulkUploadRowError
+from .periods import parse_month
 
 
 class ReportSerializer(serializers.ModelSerializer):
@@ -7,16 +13,19 @@ class ReportSerializer(serializers.ModelSerializer):
         model = Report
         fields = ['id', 'ngo_id', 'month', 'people_helped', 'events_conducted', 'funds_utilized', 'created_at']
         read_only_fields = ['id', 'created_at']
+        # Re-submitting an existing (ngo_id, month) updates it, so skip the unique-together check
+        validators = []
 
     def validate_month(self, value):
         """Validate month format (YYYY-MM)."""
+        year, _, month = value.partition('-')
+        if len(year) != 4 or len(month) != 2:
+            raise serializers.ValidationError("Month must be in YYYY-MM format")
         try:
-            year, month = value.split('-')
-            if len(year) != 4 or len(month) != 2:
-                raise serializers.ValidationError("Month must be in YYYY-MM format")
-            if not (1 <= int(month) <= 12):
-                raise serializers.ValidationError("Month must be between 01 and 12")
+            parse_month(value)
         except ValueError:
+            if year.isdigit() and month.isdigit():
+                raise serializers.ValidationError("Month must be between 01 and 12")
             raise serializers.ValidationError("Month must be in YYYY-MM format")
         return value
 
@@ -24,8 +33,15 @@ class ReportSerializer(serializers.ModelSerializer):
 class BulkUploadJobSerializer(serializers.ModelSerializer):
     class Meta:
         model = BulkUploadJob
-        fields = ['job_id', 'status', 'total_rows', 'processed_rows', 'successful_rows', 'failed_rows', 'error_message', 'created_at', 'updated_at']
-        read_only_fields = ['job_id', 'status', 'total_rows', 'processed_rows', 'successful_rows', 'failed_rows', 'error_message', 'created_at', 'updated_at']
+        fields = ['job_id', 'status', 'total_rows', 'processed_rows', 'successful_rows', 'failed_rows', 'skipped_rows', 'error_message', 'error_counts', 'created_at', 'updated_at']
+        read_only_fields = ['job_id', 'status', 'total_rows', 'processed_rows', 'successful_rows', 'failed_rows', 'skipped_rows', 'error_message', 'error_counts', 'created_at', 'updated_at']
+
+
+class BulkUploadRowErrorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BulkUploadRowError
+        fields = ['row_number', 'code', 'field', 'raw_value', 'message']
+        read_only_fields = fields
 
 
 class DashboardSerializer(serializers.Serializer):
@@ -35,4 +51,112 @@ class DashboardSerializer(serializers.Serializer):
     total_events_conducted = serializers.IntegerField()
     total_funds_utilized = serializers.DecimalField(max_digits=15, decimal_places=2)
     reports = ReportSerializer(many=True, read_only=True)
+    next_cursor = serializers.CharField(allow_null=True)
+
+
+
+class TrendChangeSerializer(serializers.Serializer):
+    total_ngos_reporting = serializers.IntegerField()
+    total_people_helped = serializers.IntegerField()
+    total_events_conducted = serializers.IntegerField()
+    total_funds_utilized = serializers.DecimalField(max_digits=20, decimal_places=2)
+
+
+class TrendMonthSerializer(serializers.Serializer):
+    month = serializers.CharField()
+    total_ngos_reporting = serializers.IntegerField()
+    total_people_helped = serializers.IntegerField()
+    total_events_conducted = serializers.IntegerField()
+    total_funds_utilized = serializers.DecimalField(max_digits=20, decimal_places=2)
+    change = TrendChangeSerializer(allow_null=True)
+
+
+class NGORankingSerializer(serializers.Serializer):
+    rank = serializers.IntegerField()
+    ngo_id = serializers.CharField()
+    people_helped = serializers.IntegerField()
+    events_conducted = serializers.IntegerField()
+    funds_utilized = serializers.DecimalField(max_digits=20, decimal_places=2)
+    months_reported = serializers.IntegerField()
+
+
+class TrendSerializer(serializers.Serializer):
+    from_month = serializers.CharField()
+    to_month = serializers.CharField()
+    ngo_id = serializers.CharField(allow_null=True)
+    months = TrendMonthSerializer(many=True)
+    rankings = NGORankingSerializer(many=True, allow_null=True)
+
+
+# Read-only fast path producing exactly what ReportSerializer(many=True) + JSONRenderer would
+REPORT_FIELDS = ReportSerializer.Meta.fields
+_CENTS = Decimal('.01')
+_json_encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+
+def report_rows(queryset):
+    """Fetch reports as plain tuples in ``REPORT_FIELDS`` order."""
+    return queryset.values_list(*REPORT_FIELDS)
+
+
+def fast_report_dicts(rows):
+    """Turn ``report_rows()`` tuples into dicts identical to ``ReportSerializer(...).data``.
+
+    Skips DRF field construction and validation entirely; decimals and
+    datetimes are formatted directly.
+    """
+    tz = timezone.get_current_timezone()
+    tz_is_utc = tz is dt_timezone.utc or getattr(tz, 'key', None) == 'UTC'
+    for report_id, ngo_id, month, people_helped, events_conducted, funds_utilized, created_at in rows:
+        if created_at:
+            # Values read back from the database are already UTC
+            if not (tz_is_utc and created_at.tzinfo is dt_timezone.utc):
+                created_at = timezone.localtime(created_at, tz)
+            created_at = created_at.isoformat()
+            if created_at.endswith('+00:00'):
+                created_at = created_at[:-6] + 'Z'
+        if not isinstance(funds_utilized, Decimal) or funds_utilized.as_tuple().exponent != -2:
+            funds_utilized = Decimal(funds_utilized).quantize(_CENTS)
+        yield {
+            'id': report_id,
+            'ngo_id': ngo_id,
+            'month': month,
+            'people_helped': people_helped,
+            'events_conducted': events_conducted,
+            'funds_utilized': '{:f}'.format(funds_utilized),
+            'created_at': created_at,
+        }
+
+
+def iter_reports_json(rows):
+    """Stream a JSON array of reports as UTF-8 byte chunks (one per report)."""
+    separator = b'['
+    for report in fast_report_dicts(rows):
+        yield separator + _encode_json(report)
+        separator = b','
+    yield b']' if separator == b',' else b'[]'
+
+
+def iter_reports_jsonl(rows):
+    """Stream reports as JSON Lines (one report object per line) in UTF-8 byte chunks."""
+    for report in fast_report_dicts(rows):
+        yield _encode_json(report) + b'\n'
+
+
+def iter_dashboard_json(dashboard, rows):
+    """Stream a ``DashboardSerializer`` payload whose reports come from ``report_rows()``.
+
+    ``dashboard`` is ``DashboardSerializer(...).data`` built with an empty
+    ``reports`` list; the reports are spliced in at their usual position.
+    """
+    dashboard = dict(dashboard)
+    dashboard.pop('reports')
+    next_cursor = dashboard.pop('next_cursor')
+    yield _encode_json(dashboard)[:-1] + b',"reports":'
+    yield from iter_reports_json(rows)
+    yield b',"next_cursor":' + _encode_json(next_cursor) + b'}'
+
 
+def _encode_json(data):
+    # Matches rest_framework.renderers.JSONRenderer's compact output
+    return _json_encoder.encode(data).replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode('utf-8')
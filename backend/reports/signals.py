@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_job_status
+from .models import BulkUploadJob
+
+
+@receiver(post_save, sender=BulkUploadJob)
+def drop_cached_job_status(sender, instance, **kwargs):
+    """Status changes saved through the model invalidate the cached job status."""
+    invalidate_job_status(instance.job_id)
@@ -0,0 +1,170 @@
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from collections import defaultdict
+from decimal import Decimal
+
+from .models import MonthlySummary, Report
+from .cache import invalidate_months
+from .periods import month_range_filter
+
+
+CENTS = Decimal('0.01')
+
+
+def report_totals(people_helped, events_conducted, funds_utilized):
+    """Normalise a report's summed columns to the values the database stores."""
+    funds_utilized = Report._meta.get_field('funds_utilized').to_python(funds_utilized).quantize(CENTS)
+    return int(people_helped), int(events_conducted), funds_utilized
+
+
+def apply_report_changes(changes):
+    """Apply report inserts/updates to the ``MonthlySummary`` rollup.
+
+    ``changes`` is an iterable of ``(month, old, new)`` where ``old`` and
+    ``new`` are ``(people_helped, events_conducted, funds_utilized)`` tuples
+    and ``old`` is ``None`` for a newly created report. Must run in the same
+    transaction as the report writes.
+    """
+    deltas = defaultdict(lambda: [0, 0, 0, Decimal(0)])
+    for month, old, new in changes:
+        delta = deltas[month]
+        new = report_totals(*new)
+        if old is None:
+            delta[0] += 1
+            old = (0, 0, Decimal(0))
+        else:
+            old = report_totals(*old)
+        delta[1] += new[0] - old[0]
+        delta[2] += new[1] - old[1]
+        delta[3] += new[2] - old[2]
+
+    if not deltas:
+        return
+
+    invalidate_months(deltas)
+
+    months = sorted(deltas)  # Fixed lock order across concurrent writers
+    MonthlySummary.objects.bulk_create([MonthlySummary(month=month) for month in months], ignore_conflicts=True)
+    now = timezone.now()
+    for month in months:
+        ngos, people, events, funds = deltas[month]
+        MonthlySummary.objects.filter(month=month).update(
+            total_ngos_reporting=F('total_ngos_reporting') + ngos,
+            total_people_helped=F('total_people_helped') + people,
+            total_events_conducted=F('total_events_conducted') + events,
+            total_funds_utilized=F('total_funds_utilized') + funds,
+            updated_at=now,
+        )
+
+
+def rebuild_monthly_summaries():
+    """Recompute every ``MonthlySummary`` row from the ``Report`` table.
+
+    Safe to run while reports are being written. On PostgreSQL the summary
+    table is locked before the reports are aggregated, so writers that have
+    applied their deltas are waited for (and counted), and those that have
+    not wait until the rebuild commits and then apply them to the new rows.
+    SQLite allows one writer at a time, and a transaction whose read went
+    stale fails to write instead of writing over it.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {connection.ops.quote_name(MonthlySummary._meta.db_table)} '
+                               'IN EXCLUSIVE MODE')
+        rows = (
+            Report.objects.values('month')
+            .annotate(
+                total_ngos_reporting=Count('ngo_id', distinct=True),
+                total_people_helped=Sum('people_helped'),
+                total_events_conducted=Sum('events_conducted'),
+                total_funds_utilized=Sum('funds_utilized'),
+            )
+            .order_by('month')
+        )
+        summaries = [MonthlySummary(**row) for row in rows]
+
+        stale_months = list(MonthlySummary.objects.values_list('month', flat=True))
+        MonthlySummary.objects.all().delete()
+        MonthlySummary.objects.bulk_create(summaries, batch_size=1000)
+        invalidate_months(stale_months + [summary.month for summary in summaries])
+    return len(summaries)
+
+
+RANKING_FIELDS = ['people_helped', 'events_conducted', 'funds_utilized']
+
+
+def month_range(start, end):
+    """List every ``YYYY-MM`` month from ``start`` to ``end`` inclusive."""
+    year, month = map(int, start.split('-'))
+    end_year, end_month = map(int, end.split('-'))
+    months = []
+    while (year, month) <= (end_year, end_month):
+        months.append(f'{year:04d}-{month:02d}')
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def monthly_trend(start, end, ngo_id=None):
+    """Per-month totals and month-over-month changes for ``start``..``end``.
+
+    Reads the ``MonthlySummary`` rollup, or groups ``Report`` rows by month
+    in a single query when narrowed to one ``ngo_id``. Months without
+    reports are included with zero totals so the series has no gaps.
+    """
+    if ngo_id:
+        rows = (
+            Report.objects.filter(month_range_filter(start, end), ngo_id=ngo_id)
+            .values('month')
+            .annotate(
+                total_ngos_reporting=Count('ngo_id', distinct=True),
+                total_people_helped=Sum('people_helped'),
+                total_events_conducted=Sum('events_conducted'),
+                total_funds_utilized=Sum('funds_utilized'),
+            )
+        )
+    else:
+        rows = MonthlySummary.objects.filter(month__gte=start, month__lte=end).values(
+            'month', 'total_ngos_reporting', 'total_people_helped',
+            'total_events_conducted', 'total_funds_utilized',
+        )
+    by_month = {row['month']: row for row in rows}
+
+    trend = []
+    previous = None
+    for month in month_range(start, end):
+        row = by_month.get(month) or {}
+        point = {
+            'month': month,
+            'total_ngos_reporting': row.get('total_ngos_reporting') or 0,
+            'total_people_helped': row.get('total_people_helped') or 0,
+            'total_events_conducted': row.get('total_events_conducted') or 0,
+            'total_funds_utilized': row.get('total_funds_utilized') or Decimal(0),
+            'change': None,
+        }
+        if previous is not None:
+            point['change'] = {
+                key: point[key] - previous[key]
+                for key in ('total_ngos_reporting', 'total_people_helped',
+                            'total_events_conducted', 'total_funds_utilized')
+            }
+        trend.append(point)
+        previous = point
+    return trend
+
+
+def ngo_rankings(start, end, rank_by='people_helped', limit=10):
+    """Top NGOs over ``start``..``end`` by the summed ``rank_by`` column, in one grouped query."""
+    rows = (
+        Report.objects.filter(month_range_filter(start, end))
+        .values('ngo_id')
+        .annotate(
+            people_helped=Sum('people_helped'),
+            events_conducted=Sum('events_conducted'),
+            funds_utilized=Sum('funds_utilized'),
+            months_reported=Count('month'),
+        )
+        .order_by(f'-{rank_by}', 'ngo_id')[:limit]
+    )
+    return [dict(row, rank=rank) for rank, row in enumerate(rows, start=1)]
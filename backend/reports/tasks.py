@@ -1,127 +1,337 @@
-from celery import shared_task
-from django.db import transaction
+from celery import chord, shared_task
+from django.conf import settings
+from django.core.files import File
+from django.db.models import F
 from django.utils import timezone
+from kombu.exceptions import OperationalError
+from datetime import timedelta
+from itertools import islice
 import csv
 import io
-from datetime import datetime
+import logging
+import os
 
-from .models import Report, BulkUploadJob
+from .models import BulkUploadJob
+from .ingest import (
+    IngestResult, count_csv_rows, ingest_rows, iter_decoded_lines, iter_shard_rows, split_csv_into_shards,
+)
+from .progress import ProgressReporter
+from .errors import RowErrorLog
+from .dedup import ChunkLedger
+from .cache import invalidate_job_status
 
+logger = logging.getLogger(__name__)
 
-def _process_csv_upload_internal(job_id, file_content):
-    """Internal function to process CSV upload (can be called directly or via Celery)."""
+
+def _rewind_to_checkpoint(job):
+    """Reset a job's counters to its last checkpoint and return an ``IngestResult`` seeded with them.
+
+    Rows after the checkpoint may already have been written, but writes are
+    idempotent upserts on ``(ngo_id, month)`` so they are simply processed
+    again. Rejected rows recorded after the checkpoint are deleted so they are
+    not reported twice. Jobs without a usable checkpoint (new jobs, or
+    sharded imports, which do not checkpoint) restart from row 1.
+    """
+    result = IngestResult()
+    checkpoint = job.checkpoint_row if job.checkpoint_row == job.processed_rows else 0
+    if checkpoint:
+        result.processed_rows = checkpoint
+        result.successful_rows = job.successful_rows
+        result.failed_rows = job.failed_rows
+        result.skipped_rows = job.skipped_rows
+        result.error_counts = dict(job.error_counts)
+        result.errors = list(
+            job.row_errors.filter(row_number__lte=checkpoint)
+            .order_by('row_number').values_list('row_number', 'message')[:IngestResult.MAX_ERROR_SAMPLES]
+        )
+    job.row_errors.filter(row_number__gt=checkpoint).delete()
+
+    job.processed_rows = result.processed_rows
+    job.successful_rows = result.successful_rows
+    job.failed_rows = result.failed_rows
+    job.skipped_rows = result.skipped_rows
+    job.error_counts = result.error_counts
+    job.checkpoint_row = checkpoint
+    job.save(update_fields=['processed_rows', 'successful_rows', 'failed_rows', 'skipped_rows', 'error_counts',
+                            'checkpoint_row', 'updated_at'])
+    return result
+
+
+def _log_import(job_id, result, shard=None):
+    """Log an import's row counts and the seconds spent in each stage as one ``key=value`` line."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    stages = ' '.join(f'{stage}_s={seconds:.3f}' for stage, seconds in sorted(result.stage_seconds.items()))
+    logger.info('import job=%s%s processed=%d successful=%d failed=%d skipped=%d %s',
+                job_id, f' shard={shard}' if shard else '', result.processed_rows, result.successful_rows,
+                result.failed_rows, result.skipped_rows, stages)
+
+
+def _process_csv_upload_internal(job_id, file_content=None, batch_size=None, file=None):
+    """Internal function to process CSV upload (can be called directly or via Celery).
+
+    The CSV is read from ``file`` (any Django ``File``, streamed chunk by
+    chunk) when given, otherwise from the ``file_content`` string. Processing
+    continues after the job's ``checkpoint_row`` if an earlier run was
+    interrupted.
+    """
     job = BulkUploadJob.objects.get(job_id=job_id)
     job.status = 'processing'
-    job.save()
+    job.save(update_fields=['status', 'updated_at'])
     
-    successful_rows = 0
-    failed_rows = 0
-    errors = []
+    result = _rewind_to_checkpoint(job)
+    result.error_log = RowErrorLog(job)
+    reporter = ProgressReporter(job)
     
     try:
-        # Parse CSV
-        csv_file = io.StringIO(file_content)
-        reader = csv.DictReader(csv_file)
+        # Parse CSV lazily so memory stays bounded by the batch size
+        if file is not None:
+            lines = iter_decoded_lines(file.chunks())
+        else:
+            lines = io.StringIO(file_content)
+            job.total_rows = count_csv_rows([file_content.encode('utf-8')])
+            job.save(update_fields=['total_rows', 'updated_at'])
+        reader = csv.DictReader(lines)
         
-        # Get all rows first to count total
-        rows = list(reader)
-        total_rows = len(rows)
-        job.total_rows = total_rows
-        job.save()
+        # Skip the rows committed before the checkpoint (they are parsed, not re-validated or written)
+        rows = islice(enumerate(reader, start=1), result.processed_rows, None)
         
-        # Process each row
-        for idx, row in enumerate(rows):
-            try:
-                # Validate required fields
-                required_fields = ['ngo_id', 'month', 'people_helped', 'events_conducted', 'funds_utilized']
-                missing_fields = [field for field in required_fields if not row.get(field)]
-                
-                if missing_fields:
-                    errors.append(f"Row {idx + 1}: Missing fields: {', '.join(missing_fields)}")
-                    failed_rows += 1
-                    job.processed_rows = idx + 1
-                    job.failed_rows = failed_rows
-                    job.save()
-                    continue
-                
-                # Validate month format
-                try:
-                    datetime.strptime(row['month'], '%Y-%m')
-                except ValueError:
-                    errors.append(f"Row {idx + 1}: Invalid month format '{row['month']}'. Use YYYY-MM")
-                    failed_rows += 1
-                    job.processed_rows = idx + 1
-                    job.failed_rows = failed_rows
-                    job.save()
-                    continue
-                
-                # Validate numeric fields
-                try:
-                    people_helped = int(row['people_helped'])
-                    events_conducted = int(row['events_conducted'])
-                    funds_utilized = float(row['funds_utilized'])
-                    
-                    if people_helped < 0 or events_conducted < 0 or funds_utilized < 0:
-                        errors.append(f"Row {idx + 1}: Negative values not allowed")
-                        failed_rows += 1
-                        job.processed_rows = idx + 1
-                        job.failed_rows = failed_rows
-                        job.save()
-                        continue
-                except ValueError as e:
-                    errors.append(f"Row {idx + 1}: Invalid numeric values - {str(e)}")
-                    failed_rows += 1
-                    job.processed_rows = idx + 1
-                    job.failed_rows = failed_rows
-                    job.save()
-                    continue
-                
-                # Create or update report (idempotent)
-                with transaction.atomic():
-                    report, created = Report.objects.get_or_create(
-                        ngo_id=row['ngo_id'],
-                        month=row['month'],
-                        defaults={
-                            'people_helped': people_helped,
-                            'events_conducted': events_conducted,
-                            'funds_utilized': funds_utilized,
-                        }
-                    )
-                    
-                    if not created:
-                        # Update existing report
-                        report.people_helped = people_helped
-                        report.events_conducted = events_conducted
-                        report.funds_utilized = funds_utilized
-                        report.save()
-                
-                successful_rows += 1
-                job.processed_rows = idx + 1
-                job.successful_rows = successful_rows
-                job.save()
-                
-            except Exception as e:
-                errors.append(f"Row {idx + 1}: {str(e)}")
-                failed_rows += 1
-                job.processed_rows = idx + 1
-                job.failed_rows = failed_rows
-                job.save()
+        # Validate and upsert rows in batches, coalescing progress writes
+        ledger = ChunkLedger(job) if settings.BULK_UPLOAD_DEDUP else None
+        result = ingest_rows(rows, batch_size or settings.BULK_UPLOAD_BATCH_SIZE,
+                             on_batch=reporter.update, result=result, ledger=ledger)
+        errors = result.errors
+        reporter.flush()
         
-        # Mark job as completed
+        # Mark job as completed, replacing the up-front estimate with the real row count
         job.status = 'completed'
+        job.total_rows = result.processed_rows
+        job.error_counts = result.error_counts
         if errors:
-            job.error_message = '\n'.join(errors[:10])  # Store first 10 errors
-        job.save()
+            job.error_message = '\n'.join(message for _, message in errors[:10])  # Store first 10 errors
+        job.save(update_fields=['status', 'total_rows', 'error_message', 'error_counts', 'updated_at'])
+        _log_import(job_id, result)
         
     except Exception as e:
+        # Leave the job at its last checkpoint: counters as of the last
+        # committed batch, and no rejected rows from the batch that failed
+        reporter.flush()
+        job.row_errors.filter(row_number__gt=reporter.processed_rows).delete()
         job.status = 'failed'
         job.error_message = f"Processing failed: {str(e)}"
-        job.save()
+        job.save(update_fields=['status', 'error_message', 'updated_at'])
         raise
 
 
-@shared_task(bind=True)
-def process_csv_upload(self, job_id, file_content):
-    """Process CSV file upload asynchronously via Celery."""
-    return _process_csv_upload_internal(job_id, file_content)
+def _discard_spooled_upload(job_id, file_path):
+    """Remove a job's spooled upload once it completes or can no longer be resumed.
+
+    Until then it is kept so the job can be resumed.
+    """
+    if file_path and os.path.exists(file_path):
+        os.remove(file_path)
+    BulkUploadJob.objects.filter(job_id=job_id).update(file_path='')
+
+
+def _dispatch_csv_shards(job_id, file, shards, batch_size=None):
+    """Split a CSV into shards and process them in parallel as a Celery chord.
+
+    Each shard is handled by ``process_csv_shard``; ``finalize_csv_shards``
+    reduces the per-shard results into the parent job once all have finished.
+    """
+    job = BulkUploadJob.objects.get(job_id=job_id)
+    job.status = 'processing'
+    job.save(update_fields=['status', 'updated_at'])
+    
+    _rewind_to_checkpoint(job)
+    
+    try:
+        shard_paths = split_csv_into_shards(file, job_id, shards)
+    except Exception as e:
+        job.status = 'failed'
+        job.error_message = f"Processing failed: {str(e)}"
+        job.save(update_fields=['status', 'error_message', 'updated_at'])
+        raise
+    
+    callback = finalize_csv_shards.s(job_id).on_error(fail_csv_upload.si(job_id))
+    return chord(
+        process_csv_shard.s(job_id, shard_path, batch_size) for shard_path in shard_paths
+    )(callback)
+
+
+@shared_task(bind=True, ignore_result=True)
+def process_csv_upload(self, job_id, file_content=None, file_path=None):
+    """Process CSV file upload asynchronously via Celery.
+
+    Large uploads are handed over as a ``file_path`` in the spool directory
+    rather than as ``file_content``; the spooled file is removed once the job
+    completes and kept otherwise, so the job can be resumed. Uploads of at
+    least ``BULK_UPLOAD_SHARD_MIN_ROWS`` rows are split into
+    ``BULK_UPLOAD_SHARDS`` shards processed by separate workers (unless an
+    earlier unsharded run left a checkpoint to resume from).
+    """
+    if file_path is None:
+        return _process_csv_upload_internal(job_id, file_content)
+    
+    with File(open(file_path, 'rb')) as file:
+        job = BulkUploadJob.objects.only('total_rows', 'checkpoint_row').get(job_id=job_id)
+        if (settings.BULK_UPLOAD_SHARDS > 1 and not self.request.is_eager and not job.checkpoint_row
+                and job.total_rows >= settings.BULK_UPLOAD_SHARD_MIN_ROWS):
+            _dispatch_csv_shards(job_id, file, settings.BULK_UPLOAD_SHARDS)
+            return  # finalize_csv_shards removes the spooled file
+        _process_csv_upload_internal(job_id, file=file)
+    
+    _discard_spooled_upload(job_id, file_path)
+
+
+@shared_task
+def process_csv_shard(job_id, shard_path, batch_size=None):
+    """Process one shard of a split CSV upload and return its counts and first errors."""
+    job = BulkUploadJob.objects.get(job_id=job_id)
+    reporter = ProgressReporter(job, incremental=True)
+    
+    try:
+        with open(shard_path, newline='', encoding='utf-8') as shard_file:
+            result = ingest_rows(iter_shard_rows(shard_file), batch_size or settings.BULK_UPLOAD_BATCH_SIZE,
+                                 on_batch=reporter.update, error_log=RowErrorLog(job))
+        reporter.flush()
+        _log_import(job_id, result, shard=os.path.basename(shard_path))
+    finally:
+        if os.path.exists(shard_path):
+            os.remove(shard_path)
+    
+    return {
+        'processed_rows': result.processed_rows,
+        'successful_rows': result.successful_rows,
+        'failed_rows': result.failed_rows,
+        'errors': result.errors[:10],
+        'error_counts': result.error_counts,
+    }
+
+
+@shared_task(ignore_result=True)
+def finalize_csv_shards(shard_results, job_id):
+    """Chord callback: combine per-shard counts and errors into the parent job."""
+    job = BulkUploadJob.objects.get(job_id=job_id)
+    job.processed_rows = sum(result['processed_rows'] for result in shard_results)
+    job.successful_rows = sum(result['successful_rows'] for result in shard_results)
+    job.failed_rows = sum(result['failed_rows'] for result in shard_results)
+    job.total_rows = job.processed_rows
+    job.status = 'completed'
+    
+    # Keep the first 10 errors in file order across all shards
+    errors = sorted(tuple(error) for result in shard_results for error in result['errors'])
+    if errors:
+        job.error_message = '\n'.join(message for _, message in errors[:10])
+    job.error_counts = {}
+    for result in shard_results:
+        for code, count in result['error_counts'].items():
+            job.error_counts[code] = job.error_counts.get(code, 0) + count
+    job.save(update_fields=['status', 'total_rows', 'processed_rows', 'successful_rows',
+                            'failed_rows', 'error_message', 'error_counts', 'updated_at'])
+    _discard_spooled_upload(job_id, job.file_path)
+
+
+@shared_task(ignore_result=True)
+def fail_csv_upload(job_id):
+    """Chord error callback: mark a sharded upload as failed."""
+    BulkUploadJob.objects.filter(job_id=job_id).update(
+        status='failed',
+        error_message='Processing failed: a shard could not be processed',
+        updated_at=timezone.now(),
+    )
+    invalidate_job_status(job_id)
+
+
+def enqueue_csv_upload(job_id, file_path):
+    """Queue a spooled upload for processing.
+
+    Falls back to running the task in-process when no broker is reachable,
+    returning an ``EagerResult`` in that case (as ``CELERY_TASK_ALWAYS_EAGER``
+    does).
+    """
+    try:
+        return process_csv_upload.apply_async(args=[job_id], kwargs={'file_path': file_path}, retry=False)
+    except OperationalError as e:
+        logger.warning('Celery broker unavailable (%s), processing job %s in-process', e, job_id)
+        return process_csv_upload.apply(args=[job_id], kwargs={'file_path': file_path}, throw=True)
+
+
+def _stalled(job):
+    return job.updated_at < timezone.now() - timedelta(seconds=settings.BULK_UPLOAD_STALL_SECONDS)
+
+
+def resume_csv_upload(job):
+    """Re-queue a failed or stalled upload to continue from its checkpoint.
+
+    Raises ``ValueError`` if the job cannot be resumed: it completed, it is
+    still making progress, or its spooled file is gone (synchronous uploads
+    are never spooled). Returns the task result as ``enqueue_csv_upload``.
+    """
+    if job.status == 'completed':
+        raise ValueError('Job has already completed')
+    if job.status != 'failed' and not _stalled(job):
+        raise ValueError('Job is still in progress')
+    if not job.file_path or not os.path.exists(job.file_path):
+        raise ValueError('The uploaded file is no longer available; upload it again')
+    
+    # Claim the job so concurrent resumes (or the watchdog) enqueue it only once
+    claimed = BulkUploadJob.objects.filter(pk=job.pk, status=job.status, updated_at=job.updated_at).update(
+        status='pending',
+        resume_count=F('resume_count') + 1,
+        updated_at=timezone.now(),
+    )
+    if not claimed:
+        raise ValueError('Job changed while resuming; try again')
+    invalidate_job_status(job.job_id)
+    return enqueue_csv_upload(job.job_id, job.file_path)
+
+
+@shared_task(ignore_result=True)
+def requeue_stalled_uploads():
+    """Watchdog: resume ``processing`` jobs that stopped reporting progress.
+
+    A job counts as stalled when its ``updated_at`` is older than
+    ``BULK_UPLOAD_STALL_SECONDS`` (its worker died or lost the database).
+    Jobs that were already resumed ``BULK_UPLOAD_MAX_RESUMES`` times, or
+    whose spooled file is gone, are marked failed instead. Returns the
+    number of jobs resumed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.BULK_UPLOAD_STALL_SECONDS)
+    resumed = 0
+    for job in BulkUploadJob.objects.filter(status='processing', updated_at__lt=cutoff):
+        if job.resume_count < settings.BULK_UPLOAD_MAX_RESUMES:
+            try:
+                resume_csv_upload(job)
+                resumed += 1
+                continue
+            except ValueError:
+                pass  # Not resumable; fail it below (a no-op if the job moved on meanwhile)
+            except Exception:
+                continue  # Resumed in-process and failed there; the job records the error
+        
+        failed = BulkUploadJob.objects.filter(pk=job.pk, status='processing', updated_at=job.updated_at).update(
+            status='failed',
+            error_message=f'Processing stalled at row {job.checkpoint_row} and could not be resumed',
+            updated_at=timezone.now(),
+        )
+        if failed:
+            _discard_spooled_upload(job.job_id, job.file_path)
+        invalidate_job_status(job.job_id)
+    return resumed
+
+
+@shared_task(ignore_result=True)
+def discard_failed_uploads():
+    """Remove the spooled files of jobs that failed more than ``BULK_UPLOAD_FAILED_RETENTION_SECONDS`` ago.
 
+    Failed jobs keep their file so they can be resumed; after that they must
+    be uploaded again. Returns the number of files removed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.BULK_UPLOAD_FAILED_RETENTION_SECONDS)
+    jobs = BulkUploadJob.objects.filter(status='failed', updated_at__lt=cutoff).exclude(file_path='')
+    discarded = 0
+    for job_id, file_path in jobs.values_list('job_id', 'file_path'):
+        _discard_spooled_upload(job_id, file_path)
+        discarded += 1
+    return discarded
@@ -0,0 +1,446 @@
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, connection, connections
+from django.db.models import Count, Sum
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+import os
+import tempfile
+import threading
+
+from . import ingest
+from .ingest import upsert_report, upsert_reports
+from .models import BulkUploadJob, MonthlySummary, Report
+from .summaries import rebuild_monthly_summaries
+from .tasks import _process_csv_upload_internal, discard_failed_uploads, requeue_stalled_uploads
+
+CSV_HEADER = 'ngo_id,month,people_helped,events_conducted,funds_utilized\n'
+
+
+def make_csv(rows):
+    """CSV file content for ``(ngo_id, month, people_helped, events_conducted, funds_utilized)`` rows."""
+    return CSV_HEADER + ''.join(','.join(str(value) for value in row) + '\n' for row in rows)
+
+
+def run_concurrently(target, count):
+    """Run ``target(index)`` on ``count`` threads started together; return the results in index order.
+
+    Re-raises the first exception a thread raised.
+    """
+    barrier = threading.Barrier(count, timeout=30)
+    results = [None] * count
+    errors = []
+
+    def run(index):
+        try:
+            barrier.wait()
+            results[index] = target(index)
+        except Exception as e:
+            errors.append(e)
+            barrier.abort()
+        finally:
+            connections.close_all()  # Each thread has its own connections
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return results
+
+
+class RollupAssertions:
+
+    def assertRollupMatchesReports(self, month):
+        reports = Report.objects.filter(month=month).aggregate(
+            ngos=Count('id'), people=Sum('people_helped'),
+            events=Sum('events_conducted'), funds=Sum('funds_utilized'),
+        )
+        summary = MonthlySummary.objects.get(month=month)
+        self.assertEqual(
+            (summary.total_ngos_reporting, summary.total_people_helped,
+             summary.total_events_conducted, summary.total_funds_utilized),
+            (reports['ngos'], reports['people'], reports['events'], reports['funds']),
+        )
+
+
+@skipUnless(connection.vendor == 'postgresql', 'The concurrent upserts use PostgreSQL-only SQL')
+class ConcurrentUpsertTests(RollupAssertions, TransactionTestCase):
+    """Concurrent writers to the same reports must not skew the ``MonthlySummary`` rollup."""
+
+    THREADS = 8
+
+    def test_concurrent_submits_for_one_report(self):
+        def submit(index):
+            response = Client().post('/api/report', {
+                'ngo_id': 'NGO1', 'month': '2024-01', 'people_helped': index,
+                'events_conducted': 1, 'funds_utilized': '10.50',
+            }, content_type='application/json')
+            return response.status_code
+
+        statuses = run_concurrently(submit, self.THREADS)
+
+        self.assertEqual(sorted(statuses), [200] * (self.THREADS - 1) + [201])
+        self.assertEqual(Report.objects.filter(ngo_id='NGO1', month='2024-01').count(), 1)
+        self.assertRollupMatchesReports('2024-01')
+
+    def test_concurrent_overlapping_batches(self):
+        def write(index):
+            for round_number in range(10):
+                upsert_reports([
+                    {'ngo_id': f'NGO{(index + key) % 12}', 'month': '2024-01', 'people_helped': index + round_number,
+                     'events_conducted': 1, 'funds_utilized': Decimal('2.25')}
+                    for key in range(6)
+                ])
+
+        run_concurrently(write, self.THREADS)
+
+        self.assertEqual(Report.objects.filter(month='2024-01').count(), 12)
+        self.assertRollupMatchesReports('2024-01')
+
+    def test_rebuild_during_writes(self):
+        def write_or_rebuild(index):
+            for round_number in range(10):
+                if index == 0:
+                    rebuild_monthly_summaries()
+                else:
+                    upsert_reports([
+                        {'ngo_id': f'NGO{index}-{round_number}', 'month': '2024-01', 'people_helped': 1,
+                         'events_conducted': 1, 'funds_utilized': Decimal('1.00')}
+                    ])
+
+        run_concurrently(write_or_rebuild, self.THREADS)
+
+        self.assertEqual(Report.objects.filter(month='2024-01').count(), (self.THREADS - 1) * 10)
+        self.assertRollupMatchesReports('2024-01')
+
+    def test_gives_up_after_max_attempts(self):
+        values = {'ngo_id': 'NGO1', 'month': '2024-01', 'people_helped': 1,
+                  'events_conducted': 1, 'funds_utilized': Decimal('1.00')}
+        upsert_report(values)
+
+        # As if every attempt lost the key to a concurrent insert
+        never_updates = ingest.UPSERT_REPORTS_SQL.replace('WHERE EXISTS', 'WHERE FALSE AND EXISTS')
+        with mock.patch.object(ingest, 'UPSERT_REPORTS_SQL', never_updates):
+            with self.assertRaises(DatabaseError):
+                upsert_report(dict(values, people_helped=2))
+
+        self.assertEqual(Report.objects.get(ngo_id='NGO1').people_helped, 1)
+        self.assertRollupMatchesReports('2024-01')
+
+
+class ResponseCacheTests(TestCase):
+    """Dashboard payloads are only cached when ``CACHE_RESPONSES`` is on."""
+
+    def setUp(self):
+        cache.clear()
+        upsert_report({'ngo_id': 'NGO1', 'month': '2024-07', 'people_helped': 10,
+                       'events_conducted': 1, 'funds_utilized': Decimal('1.00')})
+
+    def people_helped(self):
+        response = self.client.get('/api/dashboard?month=2024-07')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        return response.json()['total_people_helped']
+
+    @override_settings(CACHE_RESPONSES=False)
+    def test_without_shared_cache_every_request_reads_the_database(self):
+        self.assertEqual(self.people_helped(), 10)
+        # As if another process wrote it: nothing here is told about the change
+        MonthlySummary.objects.filter(month='2024-07').update(total_people_helped=42)
+        self.assertEqual(self.people_helped(), 42)
+
+    @override_settings(CACHE_RESPONSES=True)
+    def test_cached_payload_is_invalidated_by_a_submit(self):
+        self.assertEqual(self.people_helped(), 10)
+        MonthlySummary.objects.filter(month='2024-07').update(total_people_helped=42)
+        self.assertEqual(self.people_helped(), 10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/report', {
+                'ngo_id': 'NGO2', 'month': '2024-07', 'people_helped': 5,
+                'events_conducted': 1, 'funds_utilized': '1.00',
+            }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.people_helped(), 47)
+
+
+@override_settings(BULK_UPLOAD_ASYNC=False, BULK_UPLOAD_BATCH_SIZE=10)
+class RepeatedUploadTests(TestCase):
+    """Re-uploaded chunks are only skipped while the stored reports still match them."""
+
+    CONTENT = make_csv((f'NGO{i}', '2024-01', 1, 1, '1.00') for i in range(100))
+
+    def upload(self, content):
+        response = self.client.post('/api/reports/upload', {
+            'file': SimpleUploadedFile('reports.csv', content.encode('utf-8'), content_type='text/csv'),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('duplicate', response.json())
+        return response.json()
+
+    def test_identical_upload_skips_every_row(self):
+        self.upload(self.CONTENT)
+        job = self.upload(self.CONTENT)
+
+        self.assertEqual((job['status'], job['successful_rows'], job['skipped_rows']), ('completed', 100, 100))
+        self.assertEqual(MonthlySummary.objects.get(month='2024-01').total_people_helped, 100)
+
+    def test_write_after_upload_is_overwritten_by_reupload(self):
+        self.upload(self.CONTENT)
+        upsert_report({'ngo_id': 'NGO1', 'month': '2024-01', 'people_helped': 999,
+                       'events_conducted': 1, 'funds_utilized': Decimal('1.00')})
+
+        job = self.upload(self.CONTENT)
+
+        self.assertLess(job['skipped_rows'], 100)
+        self.assertEqual(Report.objects.get(ngo_id='NGO1').people_helped, 1)
+        self.assertEqual(MonthlySummary.objects.get(month='2024-01').total_people_helped, 100)
+
+    def test_write_during_upload_is_overwritten_by_reupload(self):
+        upsert_batch = ingest.upsert_reports
+        calls = []
+
+        def upsert_then_submit(values_list):
+            existing = upsert_batch(values_list)
+            calls.append(values_list)
+            if len(calls) == 1:
+                # Another writer changes a row of the first batch before the import finishes
+                upsert_batch([{'ngo_id': 'NGO1', 'month': '2024-01', 'people_helped': 999,
+                               'events_conducted': 1, 'funds_utilized': Decimal('1.00')}])
+            return existing
+
+        with mock.patch.object(ingest, 'upsert_reports', upsert_then_submit):
+            self.upload(self.CONTENT)
+        self.assertEqual(Report.objects.get(ngo_id='NGO1').people_helped, 999)
+
+        self.upload(self.CONTENT)
+
+        self.assertEqual(Report.objects.get(ngo_id='NGO1').people_helped, 1)
+        self.assertEqual(MonthlySummary.objects.get(month='2024-01').total_people_helped, 100)
+
+    def test_chunk_is_written_when_its_rows_differ(self):
+        self.upload(self.CONTENT)
+        changed = self.CONTENT.replace('NGO1,2024-01,1,', 'NGO1,2024-01,7,')
+
+        job = self.upload(changed)
+
+        self.assertEqual(job['successful_rows'], 100)
+        self.assertGreater(job['skipped_rows'], 0)
+        self.assertLess(job['skipped_rows'], 100)
+        self.assertEqual(Report.objects.get(ngo_id='NGO1').people_helped, 7)
+
+    @override_settings(BULK_UPLOAD_DEDUP=False)
+    def test_without_dedup_every_row_is_written(self):
+        self.upload(self.CONTENT)
+        job = self.upload(self.CONTENT)
+
+        self.assertEqual((job['successful_rows'], job['skipped_rows']), (100, 0))
+
+
+class SpooledUploadCleanupTests(TestCase):
+    """Spooled files are removed once their job can no longer be resumed."""
+
+    def setUp(self):
+        spool = tempfile.TemporaryDirectory()
+        self.addCleanup(spool.cleanup)
+        self.spool_dir = spool.name
+
+    def spooled_job(self, job_id, status, age, **fields):
+        file_path = os.path.join(self.spool_dir, f'{job_id}.csv')
+        with open(file_path, 'w') as file:
+            file.write(CSV_HEADER)
+        job = BulkUploadJob.objects.create(job_id=job_id, status=status, file_path=file_path, **fields)
+        BulkUploadJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - age)
+        return job
+
+    @override_settings(BULK_UPLOAD_STALL_SECONDS=60, BULK_UPLOAD_MAX_RESUMES=1)
+    def test_watchdog_removes_file_of_job_it_gives_up_on(self):
+        job = self.spooled_job('stalled', 'processing', timedelta(minutes=5), resume_count=1)
+
+        self.assertEqual(requeue_stalled_uploads(), 0)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.file_path), ('failed', ''))
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    @override_settings(BULK_UPLOAD_FAILED_RETENTION_SECONDS=3600)
+    def test_sweep_removes_files_of_failed_jobs_past_retention(self):
+        expired = self.spooled_job('expired', 'failed', timedelta(hours=2))
+        self.spooled_job('recent', 'failed', timedelta(minutes=5))
+        self.spooled_job('running', 'processing', timedelta(hours=2))
+
+        self.assertEqual(discard_failed_uploads(), 1)
+
+        expired.refresh_from_db()
+        self.assertEqual(expired.file_path, '')
+        self.assertEqual(sorted(os.listdir(self.spool_dir)), ['recent.csv', 'running.csv'])
+        self.assertEqual(discard_failed_uploads(), 0)
+
+
+@override_settings(BULK_UPLOAD_DEDUP=False)
+class CheckpointResumeTests(RollupAssertions, TestCase):
+    """A failed import resumes from its last committed batch as if it had never stopped."""
+
+    BATCH_SIZE = 10
+    # Every seventh row has a negative value
+    CONTENT = make_csv(
+        (f'NGO{i}', f'2024-0{1 + i % 3}', -1 if i % 7 == 0 else i, 1, '1.50') for i in range(1, 101)
+    )
+    INVALID_ROWS = [i for i in range(1, 101) if i % 7 == 0]
+
+    def setUp(self):
+        self.job = BulkUploadJob.objects.create(job_id='resumed', status='pending')
+
+    def run_import(self, fail_on_batch=None):
+        """Import ``CONTENT`` into the job, crashing after writing batch ``fail_on_batch``."""
+        write_batch = ingest._write_batch
+        batches = []
+
+        def write_then_crash(batch, result):
+            write_batch(batch, result)
+            batches.append(batch)
+            if len(batches) == fail_on_batch:
+                raise RuntimeError('Worker lost')
+
+        try:
+            with mock.patch.object(ingest, '_write_batch', write_then_crash):
+                _process_csv_upload_internal(self.job.job_id, self.CONTENT, batch_size=self.BATCH_SIZE)
+        finally:
+            self.job.refresh_from_db()
+
+    def test_failed_batch_leaves_job_at_its_checkpoint(self):
+        with self.assertRaises(RuntimeError):
+            self.run_import(fail_on_batch=5)
+
+        invalid = [row for row in self.INVALID_ROWS if row <= 40]
+        self.assertEqual(self.job.status, 'failed')
+        self.assertEqual(
+            (self.job.checkpoint_row, self.job.processed_rows, self.job.successful_rows, self.job.failed_rows),
+            (40, 40, 40 - len(invalid), len(invalid)),
+        )
+        self.assertEqual(self.job.error_counts, {'negative_value': len(invalid)})
+        self.assertEqual(list(self.job.row_errors.order_by('row_number').values_list('row_number', flat=True)),
+                         invalid)
+
+    def test_resume_matches_an_uninterrupted_import(self):
+        with self.assertRaises(RuntimeError):
+            self.run_import(fail_on_batch=5)
+        self.run_import()
+
+        invalid = len(self.INVALID_ROWS)
+        self.assertEqual(self.job.status, 'completed')
+        self.assertEqual(
+            (self.job.processed_rows, self.job.successful_rows, self.job.failed_rows),
+            (100, 100 - invalid, invalid),
+        )
+        self.assertEqual(self.job.error_counts, {'negative_value': invalid})
+        self.assertEqual(list(self.job.row_errors.order_by('row_number').values_list('row_number', flat=True)),
+                         self.INVALID_ROWS)
+        self.assertEqual(Report.objects.count(), 100 - invalid)
+        for month in ('2024-01', '2024-02', '2024-03'):
+            self.assertRollupMatchesReports(month)
+
+
+class CsvImportTests(RollupAssertions, TestCase):
+    """Batched CSV imports report rows the way the original row-by-row importer did."""
+
+    CONTENT = make_csv([
+        ('NGO1', '2024-01', 10, 1, '100.00'),
+        ('NGO2', '2024-01', '', 1, '100.00'),
+        ('NGO3', 'Jan-24', 10, 1, '100.00'),
+        ('NGO4', '2024-01', 'abc', 1, '100.00'),
+        ('NGO5', '2024-01', 10, -1, '100.00'),
+        ('NGO1', '2024-01', 20, 2, '200.00'),
+        ('NGO6', '2024-02', 30, 3, '300.00'),
+    ])
+
+    def run_import(self, content, batch_size=3):
+        job = BulkUploadJob.objects.create(job_id=str(BulkUploadJob.objects.count()), status='pending')
+        _process_csv_upload_internal(job.job_id, content, batch_size=batch_size)
+        job.refresh_from_db()
+        return job
+
+    def test_mixed_rows_give_the_original_messages_and_counts(self):
+        job = self.run_import(self.CONTENT)
+
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.total_rows, job.processed_rows, job.successful_rows, job.failed_rows), (7, 7, 3, 4))
+        self.assertEqual(job.error_message.split('\n'), [
+            'Row 2: Missing fields: people_helped',
+            "Row 3: Invalid month format 'Jan-24'. Use YYYY-MM",
+            "Row 4: Invalid numeric values - invalid literal for int() with base 10: 'abc'",
+            'Row 5: Negative values not allowed',
+        ])
+        self.assertEqual(job.error_counts, {
+            'missing_fields': 1, 'invalid_month': 1, 'invalid_number': 1, 'negative_value': 1,
+        })
+
+    def test_reimport_keeps_one_report_per_key(self):
+        self.run_import(self.CONTENT)
+        self.run_import(self.CONTENT, batch_size=2)
+
+        self.assertEqual(
+            sorted(Report.objects.values_list('ngo_id', 'month', 'people_helped')),
+            [('NGO1', '2024-01', 20), ('NGO6', '2024-02', 30)],
+        )
+        self.assertRollupMatchesReports('2024-01')
+        self.assertRollupMatchesReports('2024-02')
+
+    def test_failing_batch_falls_back_to_row_errors(self):
+        content = make_csv([
+            ('NGO1', '2024-01', 10, 1, '100.00'),
+            ('NGO2', '2024-01', 10 ** 20, 1, '100.00'),  # Too large for the column
+            ('NGO3', '2024-01', 30, 1, '100.00'),
+        ])
+
+        job = self.run_import(content)
+
+        self.assertEqual((job.successful_rows, job.failed_rows), (2, 1))
+        self.assertEqual(job.error_counts, {'write_failed': 1})
+        self.assertTrue(job.error_message.startswith('Row 2: '))
+        self.assertEqual(list(job.row_errors.values_list('row_number', 'code')), [(2, 'write_failed')])
+        self.assertEqual(sorted(Report.objects.values_list('ngo_id', flat=True)), ['NGO1', 'NGO3'])
+        self.assertRollupMatchesReports('2024-01')
+
+
+class ValidateRowsTests(SimpleTestCase):
+    """The columnar ``validate_rows`` agrees with validating each row on its own."""
+
+    CELLS = ['', None, '0', '3', ' 3', '+3', '-0', '-1', '1.5', '-1.50', '1e5', 'nan', '-inf', 'abc', '1_000', ['x']]
+    MONTHS = ['', None, '2024-01', '2024-1', '2024-13', 'Jan-24', '2024-01-01', ['x']]
+
+    def assertMatchesEachRow(self, rows):
+        # repr, since NaN never equals itself
+        self.assertEqual(repr(ingest.validate_rows(rows)), repr(ingest._validate_each(rows)))
+
+    def test_edge_case_values(self):
+        rows = []
+        for value in self.CELLS:
+            for field in ('people_helped', 'events_conducted', 'funds_utilized'):
+                rows.append({'ngo_id': 'NGO1', 'month': '2024-01', 'people_helped': '1',
+                             'events_conducted': '1', 'funds_utilized': '1.00', field: value})
+        for month in self.MONTHS:
+            rows.append({'ngo_id': 'NGO1', 'month': month, 'people_helped': '-1',
+                         'events_conducted': 'x', 'funds_utilized': '1.00'})
+        for ngo_id in ('', None, ' '):
+            rows.append({'ngo_id': ngo_id, 'month': '2024-13', 'people_helped': '1',
+                         'events_conducted': '1', 'funds_utilized': '1.00'})
+        numbered = list(enumerate(rows, start=1))
+
+        self.assertMatchesEachRow(numbered)
+        for row in numbered:
+            self.assertMatchesEachRow([row])
+
+    def test_rows_missing_a_column(self):
+        self.assertMatchesEachRow([
+            (1, {'ngo_id': 'NGO1', 'month': '2024-01', 'people_helped': '1',
+                 'events_conducted': '1', 'funds_utilized': '1.00'}),
+            (2, {'ngo_id': 'NGO2', 'month': '2024-01'}),
+        ])
+        self.assertEqual(ingest.validate_rows([]), [])
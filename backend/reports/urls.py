@@ -1,10 +1,22 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('report', views.submit_report, name='submit_report'),
+    path('reports/batch', views.submit_reports_batch, name='submit_reports_batch'),
     path('reports/upload', views.BulkUploadView.as_view(), name='bulk_upload'),
+    path('reports/export', views.export_reports, name='export_reports'),
     path('job-status/<str:job_id>', views.job_status, name='job_status'),
+    path('job-status/<str:job_id>/resume', views.resume_job, name='resume_job'),
+    path('job-status/<str:job_id>/wait', views.job_status_wait, name='job_status_wait'),
+    path('job-status/<str:job_id>/events', views.job_status_events, name='job_status_events'),
+    path('job-status/<str:job_id>/errors', views.job_errors, name='job_errors'),
+    path('job-status/<str:job_id>/errors.csv', views.job_rejected_rows, name='job_rejected_rows'),
     path('dashboard', views.dashboard, name='dashboard'),
+    path('dashboard/reports', views.dashboard_reports, name='dashboard_reports'),
+    path('dashboard/trend', views.dashboard_trend, name='dashboard_trend'),
+    # Async variants for ASGI deployments (ngo_tracker.asgi)
+    path('async/dashboard', async_views.dashboard, name='async_dashboard'),
+    path('async/job-status/<str:job_id>', async_views.job_status, name='async_job_status'),
 ]
 
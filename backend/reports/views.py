@@ -1,18 +1,77 @@
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Sum, Count, Q
-from django.db import transaction
 from django.utils import timezone
-from datetime import datetime
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.text import compress_sequence
+from asgiref.sync import sync_to_async
+from celery.result import EagerResult
+from operator import itemgetter
 import uuid
 import csv
+import hashlib
 import io
+import json
+import logging
+import re
+import time
 
-from .models import Report, BulkUploadJob
-from .serializers import ReportSerializer, BulkUploadJobSerializer, DashboardSerializer
-from .tasks import process_csv_upload
+from .models import Report, BulkUploadJob, MonthlySummary
+from .serializers import (
+    ReportSerializer, BulkUploadJobSerializer, BulkUploadRowErrorSerializer, DashboardSerializer,
+    TrendSerializer, REPORT_FIELDS, iter_dashboard_json, iter_reports_json, report_rows,
+)
+from .tasks import enqueue_csv_upload, resume_csv_upload
+from .ingest import count_csv_rows, iter_hashed, spool_upload, upsert_report, upsert_reports
+from .summaries import RANKING_FIELDS, month_range, monthly_trend, ngo_rankings
+from .periods import month_filter, normalize_month
+from .pagination import paginate_keyset, paginate_reports, parse_page_size
+from .errors import iter_rejected_rows_csv
+from .cache import cached_content, cached_response, dashboard_cache_key, job_status_cache_key
+from .events import JobSubscription
+from .export import (
+    EXPORT_FORMATS, CSVRenderer, JSONLinesRenderer, ParquetRenderer, export_rows, pq,
+)
+from .metrics import render_metrics
+from .routers import job_key, month_key, replica_reads
+
+logger = logging.getLogger(__name__)
+
+# Longest range the trend endpoint serves in one response (50 years)
+MAX_TREND_MONTHS = 600
+
+# Job statuses after which progress no longer changes
+JOB_FINISHED = ('completed', 'failed')
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+async def _iterate_on_sync_thread(iterator):
+    """Async iterator over a sync one, advanced on the request's sync thread."""
+    iterator = iter(iterator)
+    step = sync_to_async(next)
+    try:
+        while (chunk := await step(iterator, None)) is not None:
+            yield chunk
+    finally:
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close)()
+
+
+def _streaming_response(request, content, content_type):
+    """A ``StreamingHttpResponse`` for the sync iterator ``content`` that also streams under ASGI.
+
+    Under ASGI, Django 4.2 reads a sync iterator to the end before sending
+    any of it; there the chunks are produced one at a time on the request's
+    sync thread instead (where a server-side cursor they read from lives).
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        content = _iterate_on_sync_thread(content)
+    return StreamingHttpResponse(content, content_type=content_type)
 
 
 @api_view(['POST'])
@@ -20,27 +79,68 @@ def submit_report(request):
     """Submit a single monthly report."""
     serializer = ReportSerializer(data=request.data)
     if serializer.is_valid():
-        ngo_id = serializer.validated_data['ngo_id']
-        month = serializer.validated_data['month']
-        
-        # Use get_or_create for idempotency
-        report, created = Report.objects.get_or_create(
-            ngo_id=ngo_id,
-            month=month,
-            defaults=serializer.validated_data
-        )
-        
-        if not created:
-            # Update existing report
-            for key, value in serializer.validated_data.items():
-                setattr(report, key, value)
-            report.save()
-        
+        report, created = upsert_report(serializer.validated_data)
         return Response(ReportSerializer(report).data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+def submit_reports_batch(request):
+    """Submit up to ``REPORT_BATCH_MAX_SIZE`` reports in one request.
+    
+    Valid reports are upserted with a single set-based statement; the
+    response carries a per-item status of ``created``, ``updated`` or
+    ``error`` in request order.
+    """
+    items = request.data
+    if not isinstance(items, list):
+        return Response({'error': 'Expected a JSON array of reports'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.REPORT_BATCH_MAX_SIZE:
+        return Response({
+            'error': f'A batch may contain at most {settings.REPORT_BATCH_MAX_SIZE} reports'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    serializer = ReportSerializer(data=items, many=True)
+    if serializer.is_valid():
+        validated = serializer.validated_data
+        item_errors = [None] * len(items)
+    else:
+        # Re-validate only the good items; ListSerializer drops all data on any error
+        validated = [None] * len(items)
+        item_errors = [errors or None for errors in serializer.errors]
+        for index, item in enumerate(items):
+            if item_errors[index] is None:
+                validated[index] = serializer.child.run_validation(item)
+    
+    existing = upsert_reports([values for values in validated if values is not None])
+    
+    results = []
+    seen = set(existing)
+    counts = {'created': 0, 'updated': 0, 'error': 0}
+    for index, values in enumerate(validated):
+        if values is None:
+            result = {'index': index, 'status': 'error', 'errors': item_errors[index]}
+        else:
+            key = (values['ngo_id'], values['month'])
+            result = {
+                'index': index,
+                'status': 'updated' if key in seen else 'created',
+                'ngo_id': values['ngo_id'],
+                'month': values['month'],
+            }
+            seen.add(key)
+        counts[result['status']] += 1
+        results.append(result)
+    
+    return Response({
+        'created': counts['created'],
+        'updated': counts['updated'],
+        'failed': counts['error'],
+        'results': results,
+    })
+
+
 class BulkUploadView(APIView):
     """Handle bulk CSV upload for reports."""
     
@@ -57,70 +157,112 @@ class BulkUploadView(APIView):
         # Generate job ID
         job_id = str(uuid.uuid4())
         
-        # Read file content
+        # Estimate row count, check the encoding and hash the content in one streaming pass
+        content_hash = hashlib.sha256()
         try:
-            file_content = file.read().decode('utf-8')
+            total_rows = count_csv_rows(iter_hashed(file.chunks(), content_hash))
         except UnicodeDecodeError:
             return Response({'error': 'File must be UTF-8 encoded'}, status=status.HTTP_400_BAD_REQUEST)
+        content_hash = content_hash.hexdigest()
         
         # Create job record
         job = BulkUploadJob.objects.create(
             job_id=job_id,
             status='pending',
-            total_rows=0,
+            total_rows=total_rows,
+            content_hash=content_hash,
         )
         
-        # Process CSV synchronously (for now, since Redis/Celery not set up)
-        # This processes immediately without background workers
-        print(f"Starting synchronous CSV processing for job {job_id}")  # Debug
+        if settings.BULK_UPLOAD_ASYNC:
+            # Hand the spooled file to a Celery worker and return immediately
+            file_path = spool_upload(file, job_id)
+            job.file_path = file_path
+            job.save(update_fields=['file_path', 'updated_at'])
+            try:
+                result = enqueue_csv_upload(job_id, file_path)
+            except Exception as enqueue_error:
+                logger.exception('Could not enqueue bulk upload job %s', job_id)
+                return Response({
+                    'error': f'Processing failed: {str(enqueue_error)}',
+                    'job_id': job_id,
+                    'status': 'failed',
+                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            
+            if not isinstance(result, EagerResult):
+                return Response({
+                    'job_id': job_id,
+                    'status': 'pending',
+                    'total_rows': total_rows,
+                    'message': 'Upload received, processing started',
+                }, status=status.HTTP_202_ACCEPTED)
+            
+            # Processed eagerly in this request, so report the final status
+            job.refresh_from_db()
+            return Response(self._job_response(job), status=status.HTTP_200_OK)
+        
+        # Process CSV synchronously (no background workers required)
+        logger.debug('Processing bulk upload job %s synchronously', job_id)
         try:
             from .tasks import _process_csv_upload_internal
             
             # Call the internal function directly (synchronous)
-            print(f"Calling _process_csv_upload_internal for job {job_id}")  # Debug
-            _process_csv_upload_internal(job_id, file_content)
-            print(f"Processing completed for job {job_id}")  # Debug
+            _process_csv_upload_internal(job_id, file=file)
             
             # Refresh job from database to get latest status
             job.refresh_from_db()
-            print(f"Job status after processing: {job.status}")  # Debug
             
             # Return completed status immediately
-            response_data = {
-                'job_id': job_id,
-                'status': job.status,
-                'total_rows': job.total_rows,
-                'processed_rows': job.processed_rows,
-                'successful_rows': job.successful_rows,
-                'failed_rows': job.failed_rows,
-                'error_message': job.error_message if job.error_message else None,
-                'message': 'Upload processed successfully'
-            }
-            print(f"Returning response: {response_data}")  # Debug
-            return Response(response_data, status=status.HTTP_200_OK)
+            return Response(self._job_response(job), status=status.HTTP_200_OK)
         except Exception as sync_error:
-            import traceback
-            error_trace = traceback.format_exc()
-            print(f"ERROR processing CSV: {error_trace}")  # Debug log
+            logger.exception('Processing bulk upload job %s failed', job_id)
             
             # Update job status to failed
             try:
                 job.status = 'failed'
                 job.error_message = str(sync_error)
-                job.save()
-            except Exception as save_error:
-                print(f"ERROR saving job status: {save_error}")
+                job.save(update_fields=['status', 'error_message', 'updated_at'])
+            except Exception:
+                logger.exception('Could not mark bulk upload job %s as failed', job_id)
             
             return Response({
                 'error': f'Processing failed: {str(sync_error)}',
                 'job_id': job_id,
                 'status': 'failed',
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def _job_response(self, job):
+        return {
+            'job_id': job.job_id,
+            'status': job.status,
+            'total_rows': job.total_rows,
+            'processed_rows': job.processed_rows,
+            'successful_rows': job.successful_rows,
+            'failed_rows': job.failed_rows,
+            'skipped_rows': job.skipped_rows,
+            'error_message': job.error_message if job.error_message else None,
+            'message': 'Upload processed successfully'
+        }
 
 
-@api_view(['GET'])
-def job_status(request, job_id):
-    """Get the status of a bulk upload job."""
+@api_view(['POST'])
+def resume_job(request, job_id):
+    """Resume a failed or stalled bulk upload from its last checkpoint."""
+    try:
+        job = BulkUploadJob.objects.get(job_id=job_id)
+    except BulkUploadJob.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        result = resume_csv_upload(job)
+    except ValueError as e:
+        return Response({'error': str(e), 'job_id': job_id, 'status': job.status}, status=status.HTTP_409_CONFLICT)
+    
+    job.refresh_from_db()
+    response_status = status.HTTP_200_OK if isinstance(result, EagerResult) else status.HTTP_202_ACCEPTED
+    return Response(BulkUploadJobSerializer(job).data, status=response_status)
+
+
+def _job_status_response(job_id):
     try:
         job = BulkUploadJob.objects.get(job_id=job_id)
         serializer = BulkUploadJobSerializer(job)
@@ -129,52 +271,379 @@ def job_status(request, job_id):
         return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+def _job_status_entry(job_id):
+    """Cached ``(etag, content)`` for a job's status, or ``(None, response)`` if it does not exist."""
+    return cached_content(job_status_cache_key(job_id), lambda: _job_status_response(job_id),
+                          settings.JOB_STATUS_CACHE_TIMEOUT)
+
+
 @api_view(['GET'])
-def dashboard(request):
-    """Get aggregated dashboard data for a specific month."""
-    month = request.query_params.get('month')
+def job_status(request, job_id):
+    """Get the status of a bulk upload job (read from the replica, if any, once it is not changing)."""
+    def build():
+        with replica_reads([job_key(job_id)]):
+            return _job_status_response(job_id)
+    
+    return cached_response(request, job_status_cache_key(job_id), build, settings.JOB_STATUS_CACHE_TIMEOUT)
+
+
+@api_view(['GET'])
+def job_status_wait(request, job_id):
+    """Long-poll a bulk upload job's status.
+    
+    Blocks until the job's ``processed_rows`` differs from the
+    ``processed_rows`` query parameter, the job finishes, or ``timeout``
+    seconds (default and maximum ``JOB_STATUS_LONG_POLL_TIMEOUT``) pass,
+    then returns the current status.
+    """
+    try:
+        seen_rows = int(request.query_params.get('processed_rows', -1))
+        timeout = min(float(request.query_params.get('timeout', settings.JOB_STATUS_LONG_POLL_TIMEOUT)),
+                      settings.JOB_STATUS_LONG_POLL_TIMEOUT)
+    except ValueError:
+        return Response({'error': 'processed_rows and timeout must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    deadline = time.monotonic() + max(timeout, 0)
+    with JobSubscription(job_id) as subscription:
+        while True:
+            etag, content = _job_status_entry(job_id)
+            if etag is None:
+                return content
+            data = json.loads(content)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or data['status'] in JOB_FINISHED or data['processed_rows'] != seen_rows:
+                response = HttpResponse(content, content_type='application/json')
+                response['ETag'] = etag
+                return response
+            subscription.wait(min(remaining, settings.JOB_EVENTS_POLL_INTERVAL))
+
+
+def _job_events(job_id, subscription):
+    """Yield SSE frames for a job's status until it finishes or the stream times out."""
+    deadline = time.monotonic() + settings.JOB_EVENTS_MAX_SECONDS
+    sent = None
+    with subscription:
+        yield b'retry: 2000\n\n'
+        while True:
+            etag, content = _job_status_entry(job_id)
+            if etag is None:
+                return
+            if etag != sent:
+                yield b'event: progress\ndata: ' + content + b'\n\n'
+                sent = etag
+                if json.loads(content)['status'] in JOB_FINISHED:
+                    yield b'event: done\ndata: {}\n\n'
+                    return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if not subscription.wait(min(remaining, settings.JOB_EVENTS_POLL_INTERVAL)):
+                yield b': keep-alive\n\n'
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets ``Accept: text/event-stream`` requests through content negotiation."""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer().render(data)
+
+
+@api_view(['GET'])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def job_status_events(request, job_id):
+    """Stream a bulk upload job's status as Server-Sent Events.
+    
+    Sends a ``progress`` event with the status payload whenever it changes
+    and a ``done`` event once the job has completed or failed. Streams are
+    closed after ``JOB_EVENTS_MAX_SECONDS``; ``EventSource`` reconnects
+    automatically.
+    """
+    etag, content = _job_status_entry(job_id)
+    if etag is None:
+        return content
+    
+    response = _streaming_response(request, _job_events(job_id, JobSubscription(job_id)), 'text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Let nginx pass events through unbuffered
+    return response
+
+
+@api_view(['GET'])
+def job_errors(request, job_id):
+    """List a bulk upload job's rejected rows, ordered by row number.
+        
+    Keyset-paginated with ``cursor``/``page_size``; an optional ``code``
+    parameter filters by error code.
+    """
+    with replica_reads([job_key(job_id)]):
+        try:
+            job = BulkUploadJob.objects.get(job_id=job_id)
+        except BulkUploadJob.DoesNotExist:
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        row_errors = job.row_errors.all()
+        code = request.query_params.get('code', '').strip()
+        if code:
+            row_errors = row_errors.filter(code=code)
+        
+        try:
+            page, next_cursor = paginate_keyset(
+                row_errors,
+                'row_number',
+                cursor=request.query_params.get('cursor'),
+                page_size=parse_page_size(request.query_params.get('page_size')),
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'job_id': job.job_id,
+            'error_counts': job.error_counts,
+            'results': BulkUploadRowErrorSerializer(page, many=True).data,
+            'next_cursor': next_cursor,
+        })
+
+
+@api_view(['GET'])
+def job_rejected_rows(request, job_id):
+    """Download a bulk upload job's rejected rows as a CSV that can be fixed and re-uploaded."""
+    try:
+        with replica_reads([job_key(job_id)]):
+            job = BulkUploadJob.objects.get(job_id=job_id)
+    except BulkUploadJob.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    # The rows stream after the view returns, from the database the job was read from
+    response = _streaming_response(request, iter_rejected_rows_csv(job), 'text/csv')
+    response['Content-Disposition'] = f'attachment; filename="rejected-rows-{job.job_id}.csv"'
+    return response
+
+
+def _month_param(request):
+    """Read and validate the ``month`` query parameter.
+
+    Returns ``(month, None)`` or ``(None, error_response)``. Reads
+    ``request.GET``, so plain (async) Django requests work too.
+    """
+    month = request.GET.get('month')
     
     if not month:
-        return Response({'error': 'Month parameter is required (format: YYYY-MM)'}, status=status.HTTP_400_BAD_REQUEST)
+        return None, Response({'error': 'Month parameter is required (format: YYYY-MM)'}, status=status.HTTP_400_BAD_REQUEST)
     
     # Trim whitespace
     month = month.strip()
     
     # Validate month format
     try:
-        datetime.strptime(month, '%Y-%m')
+        month = normalize_month(month)
     except ValueError as e:
         # More detailed error message
-        return Response({
+        return None, Response({
             'error': f'Invalid month format. Use YYYY-MM (received: "{month}")'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Aggregate data for the month
-    reports = Report.objects.filter(month=month)
-    
-    aggregated = reports.aggregate(
-        total_ngos_reporting=Count('ngo_id', distinct=True),
-        total_people_helped=Sum('people_helped'),
-        total_events_conducted=Sum('events_conducted'),
-        total_funds_utilized=Sum('funds_utilized'),
-    )
-    
-    # Get individual reports
-    individual_reports = reports.order_by('ngo_id')
+    return month, None
+
+
+def _month_range_params(request, content_type=None):
+    """Read and validate the ``from`` and ``to`` query parameters (YYYY-MM, inclusive).
+
+    Returns ``({'from': ..., 'to': ...}, None)`` or ``(None, error_response)``.
+    """
+    months = {}
+    for param in ('from', 'to'):
+        value = request.query_params.get(param, '').strip()
+        if not value:
+            return None, Response({'error': f'{param} parameter is required (format: YYYY-MM)'},
+                                  status=status.HTTP_400_BAD_REQUEST, content_type=content_type)
+        try:
+            months[param] = normalize_month(value)
+        except ValueError:
+            return None, Response({
+                'error': f'Invalid {param} month format. Use YYYY-MM (received: "{value}")'
+            }, status=status.HTTP_400_BAD_REQUEST, content_type=content_type)
     
-    # Serialize individual reports
-    reports_serializer = ReportSerializer(individual_reports, many=True)
+    if months['from'] > months['to']:
+        return None, Response({'error': 'from must not be after to'},
+                              status=status.HTTP_400_BAD_REQUEST, content_type=content_type)
+    return months, None
+
+
+def _month_reports(request, condition):
+    """``report_rows()`` matching ``condition`` (a ``month_filter``), narrowed by the ``ngo_id`` prefix parameter."""
+    reports = Report.objects.filter(condition)
     
-    # Handle None values
+    ngo_prefix = request.GET.get('ngo_id', '').strip()
+    if ngo_prefix:
+        reports = reports.filter(ngo_id__startswith=ngo_prefix)
+    return report_rows(reports)
+
+
+def _page_options(request):
+    """``paginate_reports`` options from the ``cursor`` and ``page_size`` query parameters."""
+    return {
+        'cursor': request.GET.get('cursor'),
+        'page_size': parse_page_size(request.GET.get('page_size')),
+        'key': itemgetter(REPORT_FIELDS.index('ngo_id')),
+    }
+
+
+def _report_page(request, month):
+    """Fetch one keyset page of a month's reports from the request's query parameters.
+
+    Supports ``cursor``, ``page_size`` and an ``ngo_id`` prefix filter.
+    Rows are ``report_rows()`` tuples for the fast serializer path.
+    Raises ``ValueError`` for malformed parameters.
+    """
+    return paginate_reports(_month_reports(request, month_filter(month)), **_page_options(request))
+
+
+def _dashboard_response(month, summary, individual_reports, next_cursor):
+    """The dashboard payload for a month's rollup ``summary`` and first page of ``report_rows()``."""
     data = {
         'month': month,
-        'total_ngos_reporting': aggregated['total_ngos_reporting'] or 0,
-        'total_people_helped': aggregated['total_people_helped'] or 0,
-        'total_events_conducted': aggregated['total_events_conducted'] or 0,
-        'total_funds_utilized': float(aggregated['total_funds_utilized'] or 0),
-        'reports': reports_serializer.data,
+        'total_ngos_reporting': summary.total_ngos_reporting,
+        'total_people_helped': summary.total_people_helped,
+        'total_events_conducted': summary.total_events_conducted,
+        'total_funds_utilized': float(summary.total_funds_utilized),
+        'reports': [],
+        'next_cursor': next_cursor,
     }
     
+    # Serialize individual reports on the fast path, spliced into the dashboard payload
     serializer = DashboardSerializer(data)
-    return Response(serializer.data)
+    return HttpResponse(b''.join(iter_dashboard_json(serializer.data, individual_reports)),
+                        content_type='application/json')
+
+
+@api_view(['GET'])
+def dashboard(request):
+    """Get aggregated dashboard data for a specific month.
+    
+    Only the first page of reports is included; fetch the rest from
+    ``dashboard/reports`` with the returned ``next_cursor``.
+    """
+    month, error_response = _month_param(request)
+    if error_response:
+        return error_response
+    
+    @replica_reads([month_key(month)])
+    def build():
+        # Totals come from the precomputed rollup (a primary-key lookup)
+        summary = MonthlySummary.objects.filter(month=month).first() or MonthlySummary(month=month)
+        
+        # Get the first page of individual reports
+        try:
+            individual_reports, next_cursor = _report_page(request, month)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return _dashboard_response(month, summary, individual_reports, next_cursor)
+    
+    return cached_response(request, dashboard_cache_key(month, request), build, settings.DASHBOARD_CACHE_TIMEOUT)
+
+
+@api_view(['GET'])
+def dashboard_reports(request):
+    """List a month's reports with keyset (cursor) pagination ordered by ``ngo_id``."""
+    month, error_response = _month_param(request)
+    if error_response:
+        return error_response
+    
+    @replica_reads([month_key(month)])
+    def build():
+        try:
+            individual_reports, next_cursor = _report_page(request, month)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        content = b''.join([
+            b'{"month":', json.dumps(month).encode('utf-8'),
+            b',"results":', *iter_reports_json(individual_reports),
+            b',"next_cursor":', json.dumps(next_cursor).encode('utf-8'), b'}',
+        ])
+        return HttpResponse(content, content_type='application/json')
+    
+    return cached_response(request, dashboard_cache_key(month, request), build, settings.DASHBOARD_CACHE_TIMEOUT)
+
+
+@api_view(['GET'])
+def dashboard_trend(request):
+    """Per-month totals, month-over-month changes and NGO rankings for a range of months.
+    
+    Query parameters: ``from`` and ``to`` (YYYY-MM, inclusive), optional
+    ``ngo_id`` to follow a single NGO, and ``rank_by``/``limit`` for the
+    rankings (only returned when no ``ngo_id`` is given).
+    """
+    months, error_response = _month_range_params(request)
+    if error_response:
+        return error_response
+    if len(month_range(months['from'], months['to'])) > MAX_TREND_MONTHS:
+        return Response({'error': f'Range may span at most {MAX_TREND_MONTHS} months'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    rank_by = request.query_params.get('rank_by', 'people_helped')
+    if rank_by not in RANKING_FIELDS:
+        return Response({'error': f'rank_by must be one of: {", ".join(RANKING_FIELDS)}'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = parse_page_size(request.query_params.get('limit') or '10')
+    except ValueError:
+        return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    ngo_id = request.query_params.get('ngo_id', '').strip() or None
+    with replica_reads(map(month_key, month_range(months['from'], months['to']))):
+        data = {
+            'from_month': months['from'],
+            'to_month': months['to'],
+            'ngo_id': ngo_id,
+            'months': monthly_trend(months['from'], months['to'], ngo_id=ngo_id),
+            'rankings': None if ngo_id else ngo_rankings(months['from'], months['to'], rank_by=rank_by, limit=limit),
+        }
+    return Response(TrendSerializer(data).data)
+
+
+@api_view(['GET'])
+@renderer_classes([JSONRenderer, CSVRenderer, JSONLinesRenderer, ParquetRenderer])
+def export_reports(request):
+    """Stream every report from ``from`` to ``to`` (YYYY-MM, inclusive) as a file.
+    
+    ``format`` is ``csv`` (the default), ``jsonl`` or ``parquet`` (needs
+    ``pyarrow``). CSV and JSON Lines are gzip-compressed on the fly when the
+    client sends ``Accept-Encoding: gzip``.
+    """
+    export_format = request.accepted_renderer.format
+    if export_format not in EXPORT_FORMATS:
+        export_format = 'csv'
+    
+    months, error_response = _month_range_params(request, content_type='application/json')
+    if error_response:
+        return error_response
+    if export_format == 'parquet' and pq is None:
+        return Response({'error': 'Parquet export is not available on this server (pyarrow is not installed)'},
+                        status=status.HTTP_400_BAD_REQUEST, content_type='application/json')
+    
+    encode, content_type, compressible = EXPORT_FORMATS[export_format]
+    chunk_rows = settings.REPORT_EXPORT_CHUNK_SIZE
+    with replica_reads(map(month_key, month_range(months['from'], months['to']))) as using:
+        content = encode(export_rows(months['from'], months['to'], chunk_rows, using=using), chunk_rows)
+    
+    gzipped = compressible and ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if gzipped:
+        content = compress_sequence(content)
+    
+    response = _streaming_response(request, content, content_type)
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    response['Vary'] = 'Accept, Accept-Encoding'
+    response['Content-Disposition'] = (
+        f'attachment; filename="reports-{months["from"]}-to-{months["to"]}.{export_format}"'
+    )
+    return response
+
 
+def metrics(request):
+    """Request and import metrics in the Prometheus text format (404 with ``METRICS_ENABLED`` off)."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
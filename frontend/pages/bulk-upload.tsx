@@ -41,12 +41,15 @@ export default function BulkUpload() {
   const [jobId, setJobId] = useState<string | null>(null)
   const [jobStatus, setJobStatus] = useState<JobStatus | null>(null)
   const [error, setError] = useState('')
-  const [polling, setPolling] = useState(false)
 
   useEffect(() => {
-    if (jobId && !polling) {
-      setPolling(true)
-      const interval = setInterval(async () => {
+    if (!jobId) {
+      return
+    }
+
+    let interval: ReturnType<typeof setInterval> | undefined
+    const startPolling = () => {
+      interval = setInterval(async () => {
         try {
           const response = await axios.get(`${API_URL}/job-status/${jobId}`)
           const status = response.data
@@ -54,16 +57,42 @@ export default function BulkUpload() {
 
           if (status.status === 'completed' || status.status === 'failed') {
             clearInterval(interval)
-            setPolling(false)
           }
         } catch (err) {
           console.error('Error polling job status:', err)
         }
       }, 2000)
+    }
+
+    // Prefer the server-sent progress stream; fall back to polling without
+    // EventSource, or once the browser gives up on the stream (a non-200
+    // response, or a proxy that breaks it)
+    let source: EventSource | undefined
+    if (typeof EventSource !== 'undefined') {
+      const stream = new EventSource(`${API_URL}/job-status/${jobId}/events`)
+      stream.addEventListener('progress', (event) => {
+        setJobStatus(JSON.parse((event as MessageEvent).data))
+      })
+      stream.addEventListener('done', () => stream.close())
+      stream.onerror = () => {
+        if (stream.readyState === EventSource.CLOSED) {
+          console.error('Job status stream closed, polling instead')
+          stream.close()
+          startPolling()
+        } else {
+          console.error('Job status stream interrupted, reconnecting')
+        }
+      }
+      source = stream
+    } else {
+      startPolling()
+    }
 
-      return () => clearInterval(interval)
+    return () => {
+      source?.close()
+      clearInterval(interval)
     }
-  }, [jobId, polling])
+  }, [jobId])
 
   const handleFileChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     if (e.target.files && e.target.files[0]) {
@@ -50,6 +50,13 @@ interface DashboardData {
   total_events_conducted: number
   total_funds_utilized: number
   reports: Report[]
+  next_cursor: string | null
+}
+
+interface ReportPage {
+  month: string
+  results: Report[]
+  next_cursor: string | null
 }
 
 export default function Dashboard() {
@@ -59,6 +66,7 @@ export default function Dashboard() {
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState('')
   const [data, setData] = useState<DashboardData | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   const handleLoad = async (monthToLoad?: string) => {
     // Ensure we have a string value - handle both string and object cases
@@ -107,6 +115,31 @@ export default function Dashboard() {
     }
   }
 
+  // The dashboard only includes the first page of reports; fetch the rest a page at a time
+  const handleLoadMore = async () => {
+    if (!data?.next_cursor) {
+      return
+    }
+
+    setLoadingMore(true)
+    setError('')
+
+    try {
+      const response = await axios.get<ReportPage>(`${API_URL}/dashboard/reports`, {
+        params: { month: data.month, cursor: data.next_cursor },
+      })
+      setData({
+        ...data,
+        reports: [...data.reports, ...response.data.results],
+        next_cursor: response.data.next_cursor,
+      })
+    } catch (err: any) {
+      setError(err.response?.data?.error || 'Failed to load more reports. Please try again.')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const getCurrentMonth = () => {
     const now = new Date()
     return `${now.getFullYear()}-${String(now.getMonth() + 1).padStart(2, '0')}`
@@ -262,7 +295,7 @@ export default function Dashboard() {
                 Summary for {data.month}
               </Typography>
               <Chip
-                label={`${data.reports?.length || 0} Reports`}
+                label={`${data.total_ngos_reporting} Reports`}
                 color="primary"
                 variant="outlined"
               />
@@ -315,6 +348,9 @@ export default function Dashboard() {
                     <Typography variant="h6" sx={{ fontWeight: 600 }}>
                       Individual NGO Reports
                     </Typography>
+                    <Typography variant="body2" color="text.secondary">
+                      Showing {data.reports.length} of {data.total_ngos_reporting}
+                    </Typography>
                   </Box>
                   <TableContainer>
                     <Table>
@@ -382,6 +418,18 @@ export default function Dashboard() {
                       </TableBody>
                     </Table>
                   </TableContainer>
+                  {data.next_cursor && (
+                    <Box sx={{ p: 3, display: 'flex', justifyContent: 'center' }}>
+                      <Button
+                        variant="outlined"
+                        onClick={handleLoadMore}
+                        disabled={loadingMore}
+                        startIcon={loadingMore ? <CircularProgress size={20} color="inherit" /> : null}
+                      >
+                        {loadingMore ? 'Loading...' : 'Load More Reports'}
+                      </Button>
+                    </Box>
+                  )}
                 </CardContent>
               </Card>
             )}